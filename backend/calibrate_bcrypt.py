@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+from backend.utils.hashing.index import MIN_ROUNDS, calibrate_rounds
+
+DEFAULT_TARGET_MS = 250
+
+
+def main() -> int:
+    """
+    Benchmarks bcrypt on this host and recommends the cost to set as BCRYPT_ROUNDS.
+    The target can be set with `--target-ms` or the `BCRYPT_TARGET_MS` environment variable.
+    Returns:
+        int: 0 if a cost meets the target, 1 if even the minimum cost is slower than the target.
+    """
+
+    parser = argparse.ArgumentParser(description="Pick the bcrypt cost that meets a password verification latency target.")
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=float(os.getenv("BCRYPT_TARGET_MS", DEFAULT_TARGET_MS)),
+    )
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    rounds, timings = calibrate_rounds(args.target_ms, args.samples)
+
+    print(f"bcrypt verification time on this host (target {args.target_ms:.0f} ms):")
+    for candidate, elapsed in timings:
+        marker = "  <-" if candidate == rounds else ""
+        print(f"  {candidate:2d} rounds  {elapsed:8.1f} ms{marker}")
+
+    if timings[0][1] > args.target_ms:
+        print(f"❌ Even the minimum cost of {MIN_ROUNDS} rounds is slower than the target; using {MIN_ROUNDS}.")
+        return 1
+    print(f"✅ Set BCRYPT_ROUNDS={rounds}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
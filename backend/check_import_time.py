@@ -0,0 +1,110 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that only the Streamlit frontend needs. Pulling any of them into the
+# API import graph makes every uvicorn worker boot and reload noticeably slower.
+FORBIDDEN_MODULES = ["streamlit", "pandas", "pyarrow"]
+
+DEFAULT_BUDGET_MS = 1000
+DEFAULT_RUNS = 5
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import backend.main
+elapsed = (time.perf_counter() - started) * 1000
+forbidden = [m for m in {forbidden!r} if m in sys.modules]
+print(f"{{elapsed:.3f}}|{{','.join(forbidden)}}")
+"""
+
+
+def measure_import(forbidden: list[str]) -> tuple[float, list[str]]:
+    """
+    Imports `backend.main` in a fresh interpreter and measures how long it takes.
+    Args:
+        forbidden (list[str]): Module names that must not be imported by the backend.
+    Returns:
+        tuple[float, list[str]]: The import time in milliseconds and the forbidden modules that were loaded.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(forbidden=forbidden)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, loaded = result.stdout.strip().splitlines()[-1].split("|")
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+
+def slowest_imports(limit: int = 10) -> list[tuple[int, str]]:
+    """
+    Runs `python -X importtime` on the backend and returns the slowest imports.
+    Args:
+        limit (int): The number of entries to return.
+    Returns:
+        list[tuple[int, str]]: Cumulative import time in microseconds and the module name, slowest first.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative), name.strip()))
+    entries.sort(reverse=True)
+    return entries[:limit]
+
+
+def main() -> int:
+    """
+    Checks that importing the backend stays within the startup-time budget.
+    The budget can be set with `--budget-ms` or the `BACKEND_IMPORT_BUDGET_MS` environment variable.
+    Returns:
+        int: 0 if the backend is within budget and imports no frontend-only modules, 1 otherwise.
+    """
+
+    parser = argparse.ArgumentParser(description="Check the backend import-time budget.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("BACKEND_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)),
+    )
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args()
+
+    timings = []
+    loaded: list[str] = []
+    for _ in range(args.runs):
+        elapsed, loaded = measure_import(FORBIDDEN_MODULES)
+        timings.append(elapsed)
+    median = statistics.median(timings)
+
+    print(f"Backend import time: median {median:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports:")
+    for cumulative, name in slowest_imports():
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"❌ Frontend-only modules imported by the backend: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget_ms:
+        print("❌ Backend import time is over budget.")
+        failed = True
+    if not failed:
+        print("✅ Backend import time is within budget.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
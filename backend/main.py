@@ -1,12 +1,43 @@
-from typing import Dict, List
-from fastapi import FastAPI
-from backend.utils.users.index import (
+import time
+
+_import_started = time.perf_counter()
+
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import FastAPI, Query, Request
+from backend.utils.storage.index import (
     create_course_in_db,
     create_user,
     delete_course_enrollment_from_user,
     enroll_user_in_course,
     get_all_courses,
-    get_all_users,
+    get_user_by_email,
+    get_user_by_id,
+    update_password_hash,
+    get_course_by_id,
+    get_courses_by_teacher,
+    get_course_students,
+    get_user_enrollments,
+    get_student_catalog,
+    get_enrollment_counts,
+    get_enrollment_stats,
+    get_change_version,
+    get_changes_since,
+)
+from backend.utils.executors.index import bounded_executor, run_in_executor
+from backend.utils.hashing.index import DEFAULT_ROUNDS, PasswordHasher, calibrate_rounds
+from backend.utils.idempotency.index import IdempotencyCache, IdempotencyMiddleware
+from backend.utils.ratelimit.index import RateLimiter, client_address
+from backend.utils.routing.index import TracedRoute, TracingMiddleware
+from backend.utils.tracing.index import span
+from backend.utils.users.index import MAX_CREDIT_HOURS, get_write_stats
+from backend.utils.responses.index import (
+    CompressionMiddleware,
+    arrow_response,
+    parse_fields,
+    project,
+    wants_arrow,
 )
 from .classes.index import (
     Course,
@@ -17,11 +48,84 @@ from .classes.index import (
     RegisterRequest,
     User,
 )
-import bcrypt
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uuid
 
-app = FastAPI()
+IMPORT_DURATION_MS = (time.perf_counter() - _import_started) * 1000
+
+# Fields that can be selected with `fields=` on course list endpoints
+COURSE_LIST_FIELDS = [*Course.model_fields, "enrollment_count"]
+# Fields that can be selected with `fields=` on the student catalog
+STUDENT_CATALOG_FIELDS = [*Course.model_fields, "enrolled", "can_enroll"]
+
+# The bcrypt cost is BCRYPT_ROUNDS if set. Otherwise, if BCRYPT_TARGET_MS is set, it is calibrated at startup
+# to the highest cost whose verification stays within that many milliseconds on this host
+password_hasher = PasswordHasher(int(os.getenv("BCRYPT_ROUNDS", DEFAULT_ROUNDS)))
+# bcrypt runs in its own pool, so a burst of logins cannot take the threads that serve storage reads
+hashing_executor = bounded_executor("bcrypt", "HASHING_THREADS", 2)
+
+# Login attempts are throttled per client address and per account before any password is hashed
+login_ip_limiter = RateLimiter(
+    capacity=float(os.getenv("LOGIN_IP_BURST", "20")),
+    per_minute=float(os.getenv("LOGIN_IP_PER_MINUTE", "60")),
+)
+login_email_limiter = RateLimiter(
+    capacity=float(os.getenv("LOGIN_EMAIL_BURST", "5")),
+    per_minute=float(os.getenv("LOGIN_EMAIL_PER_MINUTE", "10")),
+)
+# Only these addresses, the frontend by default, may tell the end user's address in X-Forwarded-For
+TRUSTED_PROXIES = frozenset(
+    address.strip() for address in os.getenv("TRUSTED_PROXIES", "127.0.0.1,::1").split(",") if address.strip()
+)
+
+# Responses to creating requests, replayed when a client retries with the same Idempotency-Key
+idempotency_cache = IdempotencyCache(
+    ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600")),
+    max_keys=int(os.getenv("IDEMPOTENCY_MAX_KEYS", "2048")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Runs when the API starts serving.
+    Logs how long it took to import the API module, so slow worker boots and reloads are visible.
+    Calibrates the bcrypt cost when BCRYPT_TARGET_MS is set without BCRYPT_ROUNDS.
+    See `backend/check_import_time.py` for the budget enforced on this number.
+    When started by `launch.py`, it also creates the file named by BACKEND_READY_FILE to signal that this process
+    is ready to serve, so the launcher can retire the previous process without dropping requests.
+    """
+    
+    print(f"Backend modules imported in {IMPORT_DURATION_MS:.1f} ms")
+
+    target_ms = os.getenv("BCRYPT_TARGET_MS")
+    if target_ms and not os.getenv("BCRYPT_ROUNDS"):
+        password_hasher.rounds, _ = await run_in_executor(hashing_executor, calibrate_rounds, float(target_ms))
+        print(f"bcrypt cost calibrated to {password_hasher.rounds} rounds for a {target_ms} ms target")
+
+    ready_file = os.getenv("BACKEND_READY_FILE")
+    if ready_file:
+        with open(ready_file, "w") as f:
+            f.write(str(os.getpid()))
+
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+# Every route records route, validation and handler spans; must be set before the routes are declared
+app.router.route_class = TracedRoute
+# Innermost, so replays skip the endpoint and storage but are still compressed and traced
+app.add_middleware(
+    IdempotencyMiddleware,
+    cache=idempotency_cache,
+    paths=["/api/register", "/api/courses/create", "/api/courses/enroll"],
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+)
+# Added last so it is the outermost middleware and its span covers compression too
+app.add_middleware(TracingMiddleware)
 
 
 @app.get("/")
@@ -35,56 +139,106 @@ def root():
     return {"message": "Welcome to the Course Management System API!"}
 
 
+@app.get("/api/metrics")
+def metrics():
+    """
+    Exposes the backend's operational counters.
+    Returns:
+        dict: The configuration and allowed/rejected counters of the login rate limiters,
+            the number of user mutations and file writes made by the group committer,
+            the requests executed, replayed and rejected by the idempotency cache,
+            and the bcrypt cost with the number of password hashes upgraded to it.
+    """
+    
+    return {
+        "login_rate_limit": {
+            "ip": login_ip_limiter.stats(),
+            "email": login_email_limiter.stats(),
+        },
+        "user_writes": get_write_stats(),
+        "idempotency": idempotency_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+    }
+
+
 @app.post("/api/login")
-async def login(data: LoginRequest) -> JSONResponse:
+async def login(data: LoginRequest, request: Request) -> JSONResponse:
     """
     Handles user login by verifying email and password credentials.
+    Attempts are rate limited per client address and per email with token buckets. Throttled attempts are rejected
+    before the user store is read or any password is hashed, so bursts of bad logins cannot monopolize the CPU.
+    The client address is the end user's address forwarded by the frontend, see `client_address`.
     Args:
         data (LoginRequest): An object containing the user's email and password.
+        request (Request): The incoming request, used to identify the client address.
     Returns:
         JSONResponse: 
             - On successful authentication, returns a JSON response with status code 200, a success message, and user data.
             - On failure (invalid email or incorrect password), returns a JSON response with status code 400 and an error message.
+            - When the client or the account is throttled, returns status code 429 with a Retry-After header.
+    Notes:
+        - If the stored hash was made with a lower bcrypt cost than the configured one, it is replaced with a hash at
+          the configured cost once the password has been verified. The returned user carries the new hash.
     """
     
-    users: List[Dict[str, str | int]] | None = get_all_users()
+    client = client_address(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+        TRUSTED_PROXIES,
+    )
+    for limiter, key in ((login_ip_limiter, client), (login_email_limiter, data.email)):
+        allowed, retry_after = limiter.acquire(key)
+        if not allowed:
+            return JSONResponse(
+                status_code=429,
+                content={"message": "Too many login attempts. Please try again later.", "data": None},
+                headers={"Retry-After": str(retry_after)},
+            )
 
-    if users:
-        for user in users:
-            if user.get("email") == data.email:
-                is_pwd_correct = bcrypt.checkpw(
-                    data.password.encode(), user.get("hashed_pwd").encode()
-                )
+    user: Dict[str, str | int] | None = await get_user_by_email(data.email)
 
-                if is_pwd_correct:
-                    return JSONResponse(
-                        status_code=200,
-                        content={
-                            "message": "Login successful",
-                            "data": {
-                                "user": {
-                                    "id": user.get("id"),
-                                    "email": user.get("email"),
-                                    "role": user.get("role"),
-                                    "name": user.get("name"),
-                                    'enrolled_courses': user.get('enrolled_courses'),
-                                    "hashed_pwd": user.get('hashed_pwd')
-                                }
-                            },
-                        },
-                    )
-                else:
-                    return JSONResponse(
-                        status_code=400,
-                        content={"message": "Login failed", "data": None},
-                    )
+    if user:
+        # bcrypt is CPU bound, run it off the event loop so other requests are not stalled
+        with span("hashing.bcrypt_checkpw"):
+            is_pwd_correct = await run_in_executor(
+                hashing_executor, password_hasher.verify, data.password, user.get("hashed_pwd")
+            )
 
-        return JSONResponse(
-            status_code=400, content={"message": "Invalid email", "data": None}
-        )
+        if is_pwd_correct and password_hasher.needs_rehash(user.get("hashed_pwd")):
+            with span("hashing.bcrypt_rehash", rounds=password_hasher.rounds):
+                hashed_pwd = await run_in_executor(hashing_executor, password_hasher.hash, data.password)
+            try:
+                user = await update_password_hash(user.get("id"), hashed_pwd) or user
+                password_hasher.record_rehash()
+            except Exception as e:
+                # The old hash still works, so the login goes ahead and the upgrade is retried next time
+                print(f"Error  upgrading password hash {e}")
+
+        if is_pwd_correct:
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "message": "Login successful",
+                    "data": {
+                        "user": {
+                            "id": user.get("id"),
+                            "email": user.get("email"),
+                            "role": user.get("role"),
+                            "name": user.get("name"),
+                            'enrolled_courses': user.get('enrolled_courses'),
+                            "hashed_pwd": user.get('hashed_pwd')
+                        }
+                    },
+                },
+            )
+        else:
+            return JSONResponse(
+                status_code=400,
+                content={"message": "Login failed", "data": None},
+            )
 
     return JSONResponse(
-        status_code=400, content={"message": "Invalid email or password.", "data": None}
+        status_code=400, content={"message": "Invalid email", "data": None}
     )
 
 
@@ -92,9 +246,11 @@ async def login(data: LoginRequest) -> JSONResponse:
 async def register(data: RegisterRequest) -> JSONResponse:
     """
     Registers a new user in the system.
+    Requests carrying an `Idempotency-Key` header are executed once; retries with the same key get the first response back.
     This function checks if a user with the provided email already exists. If not, it hashes the user's password,
-    creates a new user object, and saves it to the database. Handles and returns appropriate responses for
-    success, duplicate user, and server errors.
+    creates a new user object, and saves it to the database. The email is checked again when the user is stored,
+    so concurrent registrations with the same email create a single user. Handles and returns appropriate responses
+    for success, duplicate user, and server errors.
     Args:
         data (RegisterRequest): The registration data containing user's name, email, password, and role.
     Returns:
@@ -104,17 +260,14 @@ async def register(data: RegisterRequest) -> JSONResponse:
             - 500 for any server or creation errors.
     """
     
-    users: list[User] | None = get_all_users()
-
-    if users:
-        for user in users:
-            if user.get("email") == data.email:
-                return JSONResponse(
-                    status_code=400,
-                    content={"message": "User already exists.", "data": None},
-                )
+    if await get_user_by_email(data.email) is not None:
+        return JSONResponse(
+            status_code=400,
+            content={"message": "User already exists.", "data": None},
+        )
 
-    hashed_pwd = bcrypt.hashpw(data.password.encode(), bcrypt.gensalt()).decode()
+    with span("hashing.bcrypt_hashpw", rounds=password_hasher.rounds):
+        hashed_pwd = await run_in_executor(hashing_executor, password_hasher.hash, data.password)
     id = str(uuid.uuid1())
     new_user = User(
         id=id, name=data.name, email=data.email, role=data.role, hashed_pwd=hashed_pwd, enrolled_courses=[]
@@ -122,7 +275,11 @@ async def register(data: RegisterRequest) -> JSONResponse:
 
     if new_user:
         try:
-            create_user(new_user)
+            if await create_user(new_user) is None:
+                return JSONResponse(
+                    status_code=400,
+                    content={"message": "User already exists.", "data": None},
+                )
             return JSONResponse(
                 status_code=201,
                 content={"message": "User created successfully.", "data": None},
@@ -142,6 +299,7 @@ async def register(data: RegisterRequest) -> JSONResponse:
 async def create_course(data: CreateCourseRequest) -> JSONResponse:
     """
     Creates a new course based on the provided data.
+    Requests carrying an `Idempotency-Key` header are executed once; retries with the same key get the first response back.
     Args:
         data (CreateCourseRequest): An object containing the course details, including
             title (str): The title of the course.
@@ -178,7 +336,7 @@ async def create_course(data: CreateCourseRequest) -> JSONResponse:
     )
 
     try:
-        created_course = create_course_in_db(course)
+        created_course = await create_course_in_db(course)
         return JSONResponse(
             status_code=201,
             content={
@@ -193,23 +351,61 @@ async def create_course(data: CreateCourseRequest) -> JSONResponse:
         )
 
 
+async def with_enrollment_counts(courses: List[dict], fields: Optional[List[str]]) -> List[dict]:
+    """
+    Adds an `enrollment_count` to every course, unless a field projection leaves it out.
+    Args:
+        courses (List[dict]): The courses to annotate.
+        fields (Optional[List[str]]): The selected fields, or None if every field is returned.
+    Returns:
+        List[dict]: The annotated courses.
+    """
+    
+    if fields is not None and "enrollment_count" not in fields:
+        return courses
+    counts = await get_enrollment_counts()
+    return [{**course, "enrollment_count": counts.get(course["id"], 0)} for course in courses]
+
+
 @app.get("/api/courses")
-async def get_courses() -> JSONResponse:
+async def get_courses(request: Request, fields: Optional[str] = None) -> Response:
     """
     Fetches all available courses and returns them in a JSON response.
     This asynchronous function attempts to retrieve all courses from the data source.
     If successful, it returns a JSON response with a success message and the list of courses.
     If an error occurs during retrieval, it returns a JSON response with an error message and no data.
+    Args:
+        request (Request): The incoming request. Sending `Accept: application/vnd.apache.arrow.stream` returns the
+            courses as an Arrow IPC stream instead of JSON, with nested fields flattened into columns.
+        fields (Optional[str]): A comma separated list of course fields to return, e.g. "id,title,credit_hours".
+            Returns every field, plus `enrollment_count`, when omitted.
     Returns:
-        JSONResponse: A response object containing a status code, a message, and the courses data (or None on failure).
+        Response: A response object containing a status code, a message, and the courses data (or None on failure).
+            The data also holds the change log `version` the catalog is at, to be used with `/api/changes`.
+            Returns status code 400 if `fields` names an unknown course field.
     """
     
     try:
-        courses = get_all_courses()
+        selected_fields = parse_fields(fields, COURSE_LIST_FIELDS)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"message": str(e), "data": None},
+        )
 
+    try:
+        # Read the version first, so replaying changes after it can only repeat, never miss, a change
+        version = await get_change_version()
+        courses = await with_enrollment_counts(await get_all_courses(), selected_fields)
+
+        if wants_arrow(request.headers.get("accept", "")):
+            return arrow_response(project(courses, selected_fields), {"version": version})
         return JSONResponse(
             status_code=200,
-            content={"message": "Courses fetched successfully", "data": {'courses': courses}},
+            content={
+                "message": "Courses fetched successfully",
+                "data": {'courses': project(courses, selected_fields), 'version': version},
+            },
         )
     except Exception as e:
         courses = []
@@ -219,6 +415,289 @@ async def get_courses() -> JSONResponse:
             content={"message": "Failed to fetch courses", "data": None},
         )
 
+@app.get("/api/courses/{course_id}")
+async def get_course(course_id: str) -> JSONResponse:
+    """
+    Fetches a single course by its id.
+    The lookup goes through the course offset index, so only the requested record is read from disk.
+    Args:
+        course_id (str): The id of the course to fetch.
+    Returns:
+        JSONResponse: A response with status code 200 and the course data if found,
+            404 if no course has this id, or 500 if an error occurs during retrieval.
+    """
+    
+    try:
+        course = await get_course_by_id(course_id)
+    except Exception as e:
+        print(f"Error  fetching  course {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Failed to fetch course", "data": None},
+        )
+
+    if course is None:
+        return JSONResponse(
+            status_code=404,
+            content={"message": "Course not found", "data": None},
+        )
+    return JSONResponse(
+        status_code=200,
+        content={"message": "Course fetched successfully", "data": {'course': course}},
+    )
+
+@app.get("/api/teachers/{teacher_id}/courses")
+async def get_teacher_courses(request: Request, teacher_id: str, fields: Optional[str] = None) -> Response:
+    """
+    Fetches the courses created by a teacher.
+    The courses are resolved through the teacher index, so the cost depends on the number of courses the teacher
+    has created rather than the size of the whole catalog.
+    Args:
+        request (Request): The incoming request. Sending `Accept: application/vnd.apache.arrow.stream` returns the
+            courses as an Arrow IPC stream instead of JSON.
+        teacher_id (str): The id of the teacher.
+        fields (Optional[str]): A comma separated list of course fields to return. Returns every field when omitted.
+    Returns:
+        Response: A response with status code 200 and the teacher's courses,
+            400 if `fields` names an unknown course field, or 500 if an error occurs during retrieval.
+    """
+    
+    try:
+        selected_fields = parse_fields(fields, COURSE_LIST_FIELDS)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"message": str(e), "data": None},
+        )
+
+    try:
+        courses = await with_enrollment_counts(await get_courses_by_teacher(teacher_id), selected_fields)
+
+        if wants_arrow(request.headers.get("accept", "")):
+            return arrow_response(project(courses, selected_fields))
+        return JSONResponse(
+            status_code=200,
+            content={"message": "Courses fetched successfully", "data": {'courses': project(courses, selected_fields)}},
+        )
+    except Exception as e:
+        print(f"Error  fetching  teacher courses {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Failed to fetch courses", "data": None},
+        )
+
+@app.get("/api/courses/{course_id}/students")
+async def get_students_in_course(
+    request: Request,
+    course_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+) -> Response:
+    """
+    Fetches one page of the students enrolled in a course.
+    Students are served from the course roster index, so no scan over all users is needed.
+    Args:
+        request (Request): The incoming request. Sending `Accept: application/vnd.apache.arrow.stream` returns the
+            students as an Arrow IPC stream instead of JSON, with the total in the schema metadata.
+        course_id (str): The id of the course.
+        offset (int): The number of students to skip. Defaults to 0.
+        limit (int): The maximum number of students to return, between 1 and 500. Defaults to 50.
+    Returns:
+        Response: A response with status code 200 containing the students (id, name and email) and the total
+            number of enrolled students, 404 if the course does not exist, or 500 if an error occurs during retrieval.
+    """
+    
+    try:
+        if await get_course_by_id(course_id) is None:
+            return JSONResponse(
+                status_code=404,
+                content={"message": "Course not found", "data": None},
+            )
+
+        students, total = await get_course_students(course_id, offset, limit)
+        if wants_arrow(request.headers.get("accept", "")):
+            return arrow_response(students, {"total": total, "offset": offset, "limit": limit})
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Students fetched successfully",
+                "data": {"students": students, "total": total, "offset": offset, "limit": limit},
+            },
+        )
+    except Exception as e:
+        print(f"Error  fetching  students {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Failed to fetch students", "data": None},
+        )
+
+@app.get("/api/users/{user_id}/enrollments")
+async def get_enrollments(request: Request, user_id: str) -> Response:
+    """
+    Fetches the courses a user is enrolled in.
+    Args:
+        request (Request): The incoming request. Sending `Accept: application/vnd.apache.arrow.stream` returns the
+            courses as an Arrow IPC stream instead of JSON.
+        user_id (str): The id of the user.
+    Returns:
+        Response: A response with status code 200 and the enrolled courses, 404 if the user does not exist,
+            or 500 if an error occurs during retrieval.
+    """
+    
+    try:
+        courses = await get_user_enrollments(user_id)
+    except Exception as e:
+        print(f"Error  fetching  enrollments {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Failed to fetch enrollments", "data": None},
+        )
+
+    if courses is None:
+        return JSONResponse(
+            status_code=404,
+            content={"message": "User not found", "data": None},
+        )
+    if wants_arrow(request.headers.get("accept", "")):
+        return arrow_response(courses)
+    return JSONResponse(
+        status_code=200,
+        content={"message": "Enrollments fetched successfully", "data": {"courses": courses}},
+    )
+
+@app.get("/api/students/{student_id}/catalog")
+async def get_catalog_for_student(request: Request, student_id: str, fields: Optional[str] = None) -> Response:
+    """
+    Fetches every course, annotated for one student with `enrolled` and `can_enroll` flags.
+    A course can be enrolled in if the student is not enrolled in it yet and its credit hours fit within
+    MAX_CREDIT_HOURS on top of the student's current total.
+    The response carries an ETag derived from the change log version, which moves whenever a course is created or
+    any enrollment changes, and from MAX_CREDIT_HOURS, which the `can_enroll` flags depend on. Sending it back in
+    `If-None-Match` returns 304 without building the catalog, once the student is known to exist.
+    Args:
+        request (Request): The incoming request, checked for an `If-None-Match` header.
+        student_id (str): The id of the student.
+        fields (Optional[str]): A comma separated list of fields to return, e.g. "id,title,credit_hours,enrolled".
+            Returns every course field and both flags when omitted.
+    Returns:
+        Response: A response with status code 200 containing the courses, the student's `credit_total`,
+            `max_credit_hours` and the change log `version`, 304 if the client's copy is current,
+            400 if `fields` names an unknown field, 404 if the student does not exist,
+            or 500 if an error occurs during retrieval.
+    """
+    
+    try:
+        selected_fields = parse_fields(fields, STUDENT_CATALOG_FIELDS)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"message": str(e), "data": None},
+        )
+
+    try:
+        # Read the version first, so a change made while the catalog is built only causes an extra refetch
+        version = await get_change_version()
+        if await get_user_by_id(student_id) is None:
+            return JSONResponse(
+                status_code=404,
+                content={"message": "Student not found", "data": None},
+            )
+
+        etag = f'W/"{version}-{MAX_CREDIT_HOURS}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        catalog = await get_student_catalog(student_id)
+    except Exception as e:
+        print(f"Error  fetching  student catalog {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Failed to fetch catalog", "data": None},
+        )
+
+    if catalog is None:
+        return JSONResponse(
+            status_code=404,
+            content={"message": "Student not found", "data": None},
+        )
+    courses, credit_total = catalog
+    return JSONResponse(
+        status_code=200,
+        content={
+            "message": "Catalog fetched successfully",
+            "data": {
+                "courses": project(courses, selected_fields),
+                "credit_total": credit_total,
+                "max_credit_hours": MAX_CREDIT_HOURS,
+                "version": version,
+            },
+        },
+        headers={"ETag": etag},
+    )
+
+@app.get("/api/stats")
+async def get_stats(verify: bool = False) -> JSONResponse:
+    """
+    Fetches enrollment statistics for administrators.
+    The statistics are maintained incrementally as courses are created and students enroll or drop, so polling this
+    endpoint costs the same whatever the number of users.
+    Args:
+        verify (bool): Recompute the statistics from the data files and report whether the incrementally maintained
+            ones matched. If they did not, the recomputed statistics replace them. Defaults to False.
+    Returns:
+        JSONResponse: A response with status code 200 containing the totals, the enrolled count of every course,
+            the number of students per credit-hour total, the load of every teacher, and `verified` (None unless
+            `verify` was requested), or 500 if an error occurs during retrieval.
+    """
+    
+    try:
+        stats, verified = await get_enrollment_stats(verify)
+        if verified is False:
+            print("Enrollment stats drifted from the data files and were recomputed")
+        return JSONResponse(
+            status_code=200,
+            content={"message": "Stats fetched successfully", "data": {**stats, "verified": verified}},
+        )
+    except Exception as e:
+        print(f"Error  fetching  stats {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Failed to fetch stats", "data": None},
+        )
+
+@app.get("/api/changes")
+async def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+) -> JSONResponse:
+    """
+    Fetches the catalog and enrollment changes made after a sequence number.
+    Clients keep the latest sequence number they have seen and poll with it, receiving only the deltas:
+    "course_created" (with the new course), "enrolled" and "dropped" (with the course and user ids).
+    Args:
+        since (int): The last sequence number the client has seen. Defaults to 0 for the whole history.
+        limit (int): The maximum number of changes to return, between 1 and 5000. Defaults to 500.
+    Returns:
+        JSONResponse: A response with status code 200 containing the changes oldest first, the `latest` sequence
+            number, and `has_more` if the client should poll again right away, or 500 if the log cannot be read.
+    """
+    
+    try:
+        changes, latest, has_more = await get_changes_since(since, limit)
+        return JSONResponse(
+            status_code=200,
+            content={
+                "message": "Changes fetched successfully",
+                "data": {"changes": changes, "latest": latest, "has_more": has_more},
+            },
+        )
+    except Exception as e:
+        print(f"Error  fetching  changes {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"message": "Failed to fetch changes", "data": None},
+        )
+
 @app.delete('/api/courses')
 async def delete_course_enrollment(data: DeleteCourseRequest) -> JSONResponse:
     """
@@ -236,7 +715,7 @@ async def delete_course_enrollment(data: DeleteCourseRequest) -> JSONResponse:
         course = data.course
         user = data.user
         
-        result = delete_course_enrollment_from_user(user, course)
+        result = await delete_course_enrollment_from_user(user, course)
                 
         if result['status_code'] == 200:
             return JSONResponse(
@@ -259,6 +738,7 @@ async def delete_course_enrollment(data: DeleteCourseRequest) -> JSONResponse:
 async def enroll_in_course(data: EnrollRequest) -> JSONResponse:
     """
     Enrolls a user in a specified course.
+    Requests carrying an `Idempotency-Key` header are executed once; retries with the same key get the first response back.
     Args:
         data (EnrollRequest): An object containing the user and course information required for enrollment.
     Returns:
@@ -274,7 +754,7 @@ async def enroll_in_course(data: EnrollRequest) -> JSONResponse:
         course = data.course
         user = data.user
         
-        result  = enroll_user_in_course(user, course)
+        result  = await enroll_user_in_course(user, course)
         if result['status_code'] == 200:
             return JSONResponse(
                 status_code=200,
@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+
+from backend.utils.files.index import read_json_cached, write_json_atomic
+from backend.utils.shards.index import read_manifest, shard_of, shard_paths
+
+USERS_PATH = "backend/db/users.json"
+MANIFEST_PATH = "backend/db/users.shards.json"
+
+
+def reshard(count: int, path: str = USERS_PATH, manifest_path: str = MANIFEST_PATH) -> list[int]:
+    """
+    Moves the users into `count` shards, partitioned by a hash of their id.
+    The new shard files are written first and the manifest is switched to them atomically, so an interrupted run
+    leaves the previous layout in use. The files of the previous layout are removed afterwards.
+    The backend must be stopped while resharding, since running workers keep writing to the layout they started with.
+    Args:
+        count (int): The number of shards to use. 1 stores every user in users.json again.
+        path (str): The unsharded users file.
+        manifest_path (str): The manifest that records the number of shards.
+    Returns:
+        list[int]: The number of users in each new shard.
+    """
+
+    current = read_manifest(manifest_path)
+    old_paths = shard_paths(path, current)
+    users = [user for old_path in old_paths for user in read_json_cached(old_path)]
+
+    shards: list[list[dict]] = [[] for _ in range(count)]
+    for user in users:
+        shards[shard_of(user["id"], count)].append(user)
+
+    new_paths = shard_paths(path, count)
+    if new_paths == old_paths:
+        return [len(shard) for shard in shards]
+
+    for new_path, shard in zip(new_paths, shards):
+        write_json_atomic(new_path, shard)
+    if count == 1:
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+    else:
+        write_json_atomic(manifest_path, {"shards": count})
+
+    for old_path in old_paths:
+        if old_path not in new_paths:
+            os.remove(old_path)
+    return [len(shard) for shard in shards]
+
+
+def main() -> int:
+    """
+    Reshards the user store from the command line.
+    Returns:
+        int: 0 on success, 1 if the shard count is invalid.
+    """
+
+    parser = argparse.ArgumentParser(description="Partition users.json into hash shards, or merge the shards back.")
+    parser.add_argument("shards", type=int, help="The number of shards, 1 to merge every shard back into users.json.")
+    args = parser.parse_args()
+
+    if args.shards < 1:
+        print("❌ The number of shards must be at least 1.")
+        return 1
+
+    previous = read_manifest(MANIFEST_PATH)
+    sizes = reshard(args.shards)
+    print(f"✅ Resharded users from {previous} to {args.shards} shard(s):")
+    for shard_path, size in zip(shard_paths(USERS_PATH, args.shards), sizes):
+        print(f"  {shard_path}: {size} users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils.files.index import (
+    FileIdentity,
+    file_identity,
+    scan_json_array,
+    write_json_atomic,
+)
+
+
+class CourseIndex:
+    """
+    Maps course ids to the byte range of their record in courses.json, and teacher ids to the ids of their courses.
+    The index is persisted next to the data file and is tagged with the identity of the file it was built from,
+    so it is reused across restarts and rebuilt only when courses.json has changed.
+    """
+
+    def __init__(self, path: str, index_path: str) -> None:
+        self.path = path
+        self.index_path = index_path
+        self.identity: Optional[FileIdentity] = None
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        self.by_teacher: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def ensure_fresh(self) -> None:
+        """
+        Makes sure the in-memory index matches the data file, loading the persisted index or rebuilding it if needed.
+        Raises:
+            FileNotFoundError: If the data file does not exist.
+        """
+
+        identity = file_identity(self.path)
+        if identity == self.identity:
+            return
+
+        with self._lock:
+            if identity == self.identity:
+                return
+            if not self._load_persisted(identity):
+                self._rebuild()
+
+    def refresh(self) -> None:
+        """
+        Rebuilds the index from the data file, e.g. right after the file has been rewritten.
+        """
+
+        with self._lock:
+            self._rebuild()
+
+    def record_append(
+        self, course: dict, courses: List[dict], spans: List[Tuple[int, int]], identity: FileIdentity
+    ) -> None:
+        """
+        Updates the index after `course` was appended and the file was rewritten with `dumps_json_array`.
+        Offsets are taken from the spans reported by the writer, so the file does not have to be scanned again.
+        Args:
+            course (dict): The course that was appended.
+            courses (List[dict]): Every record in the new file, in file order.
+            spans (List[Tuple[int, int]]): The byte offset and length of every record in the new file.
+            identity (FileIdentity): The identity of the new file.
+        """
+
+        with self._lock:
+            if self.identity is None:
+                self._rebuild()
+                return
+
+            self.offsets = {c["id"]: span for c, span in zip(courses, spans)}
+            self.by_teacher.setdefault(str(course["teacher"]["id"]), []).append(course["id"])
+            self.identity = identity
+            self._persist()
+
+    def get(self, course_id: str) -> Optional[dict]:
+        """
+        Reads a single course record without parsing the rest of the file.
+        Args:
+            course_id (str): The id of the course to read.
+        Returns:
+            Optional[dict]: The course record, or None if no course has this id.
+        """
+
+        courses = self.get_many([course_id])
+        return courses[0] if courses else None
+
+    def get_by_teacher(self, teacher_id: str) -> List[dict]:
+        """
+        Reads the courses created by a teacher, touching only their records.
+        Args:
+            teacher_id (str): The id of the teacher.
+        Returns:
+            List[dict]: The teacher's courses in creation order.
+        """
+
+        self.ensure_fresh()
+        return self.get_many(list(self.by_teacher.get(teacher_id, [])))
+
+    def get_many(self, course_ids: List[str]) -> List[dict]:
+        """
+        Reads several course records with positioned reads on a single file handle.
+        Args:
+            course_ids (List[str]): The ids of the courses to read. Unknown ids are skipped.
+        Returns:
+            List[dict]: The course records in the order of `course_ids`.
+        """
+
+        for _ in range(2):
+            self.ensure_fresh()
+            offsets = self.offsets
+            courses = []
+            try:
+                with open(self.path, "rb") as f:
+                    for course_id in course_ids:
+                        location = offsets.get(course_id)
+                        if location is None:
+                            continue
+                        offset, length = location
+                        f.seek(offset)
+                        course = json.loads(f.read(length))
+                        if course.get("id") != course_id:
+                            raise ValueError("stale offset")
+                        courses.append(course)
+                return courses
+            except (ValueError, AttributeError):
+                # The file was rewritten between the freshness check and the read
+                self.refresh()
+        return []
+
+    def _load_persisted(self, identity: FileIdentity) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, "r") as f:
+                persisted = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if tuple(persisted.get("identity", ())) != identity or "teachers" not in persisted:
+            return False
+
+        self.offsets = {course_id: tuple(location) for course_id, location in persisted["offsets"].items()}
+        self.by_teacher = persisted["teachers"]
+        self.identity = identity
+        return True
+
+    def _rebuild(self) -> None:
+        identity = file_identity(self.path)
+        offsets = {}
+        by_teacher: Dict[str, List[str]] = {}
+        for course, offset, length in scan_json_array(self.path):
+            offsets[course["id"]] = (offset, length)
+            by_teacher.setdefault(str(course["teacher"]["id"]), []).append(course["id"])
+
+        self.offsets = offsets
+        self.by_teacher = by_teacher
+        self.identity = identity
+        # The data file may have been replaced while it was being scanned; only persist a consistent index
+        if file_identity(self.path) == identity:
+            self._persist()
+
+    def _persist(self) -> None:
+        write_json_atomic(
+            self.index_path,
+            {"identity": list(self.identity), "offsets": self.offsets, "teachers": self.by_teacher},
+        )
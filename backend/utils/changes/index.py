@@ -0,0 +1,106 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, appends are then only serialized within the process
+    fcntl = None
+
+
+class ChangeLog:
+    """
+    Append-only log of catalog and enrollment changes, stored as JSON lines.
+    Every change gets a monotonically increasing sequence number, so clients can ask for the changes made after the
+    last sequence number they have seen instead of downloading everything again.
+    The log is mirrored in memory and caught up from the last read position whenever another process appends to it.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: List[Dict[str, Any]] = []
+        self.seqs: List[int] = []
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def record(self, change_type: str, **fields: Any) -> int:
+        """
+        Appends a change to the log.
+        Args:
+            change_type (str): The kind of change, e.g. "course_created", "enrolled" or "dropped".
+            **fields (Any): JSON serializable details of the change.
+        Returns:
+            int: The sequence number assigned to the change.
+        """
+
+        with self._lock, self._file() as f:
+            self._catch_up(f)
+            seq = self.seqs[-1] + 1 if self.seqs else 1
+            entry = {"seq": seq, "type": change_type, "at": time.time(), **fields}
+
+            f.seek(0, os.SEEK_END)
+            f.write((json.dumps(entry) + "\n").encode())
+            f.flush()
+            self._position = f.tell()
+            self._append(entry)
+            return seq
+
+    def since(self, seq: int, limit: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Returns the changes made after `seq`, oldest first.
+        Args:
+            seq (int): The last sequence number the client has seen, 0 for everything.
+            limit (int): The maximum number of changes to return.
+        Returns:
+            Tuple[List[Dict[str, Any]], int, bool]: The changes, the latest sequence number in the log,
+                and whether more changes are available after the returned ones.
+        """
+
+        with self._lock:
+            if os.path.exists(self.path) and os.path.getsize(self.path) != self._position:
+                with self._file() as f:
+                    self._catch_up(f)
+
+            start = bisect.bisect_right(self.seqs, seq)
+            changes = self.entries[start:start + limit]
+            latest = self.seqs[-1] if self.seqs else 0
+            return changes, latest, start + limit < len(self.entries)
+
+    def latest(self) -> int:
+        """
+        Returns the latest sequence number in the log, 0 if the log is empty.
+        """
+
+        return self.since(0, 0)[1]
+
+    @contextmanager
+    def _file(self) -> Iterator[Any]:
+        with open(self.path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self, f: Any) -> None:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size < self._position:
+            # The log was truncated or replaced, start over
+            self.entries, self.seqs, self._position = [], [], 0
+
+        f.seek(self._position)
+        for line in f.read(size - self._position).splitlines():
+            if line.strip():
+                self._append(json.loads(line))
+        self._position = size
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        self.seqs.append(entry["seq"])
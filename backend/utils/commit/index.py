@@ -0,0 +1,213 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+from backend.utils.files.index import FileIdentity, cache_json, file_lock, read_json_cached, write_json_atomic
+from backend.utils.tracing.index import span
+
+
+
+class Applied(NamedTuple):
+    """
+    What a mutation returns: the result for its caller, whether it changed the records and, optionally, a description
+    of the change that is passed to `after_flush` once the batch is durable.
+    """
+
+    result: Any
+    changed: bool = True
+    delta: Any = None
+
+
+Mutation = Callable[[List[Any]], Applied]
+
+
+class PendingWrite:
+    """
+    A mutation waiting to be committed, and the outcome its caller is waiting for.
+    A caller on an event loop waits on `future` instead of `done`, so it does not hold a thread while it waits.
+    """
+
+    __slots__ = ("mutation", "result", "error", "done", "future")
+
+    def __init__(self, mutation: Mutation, future: Optional[asyncio.Future] = None) -> None:
+        self.mutation = mutation
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+        self.future = future
+
+    def settle(self) -> None:
+        """
+        Wakes the caller up once the outcome is known. Runs on the committer thread.
+        """
+
+        self.done.set()
+        if self.future is not None:
+            self.future.get_loop().call_soon_threadsafe(self._resolve_future)
+
+    def _resolve_future(self) -> None:
+        # Runs on the caller's event loop; the caller may have stopped waiting
+        if self.future.cancelled():
+            return
+        if self.error is not None:
+            self.future.set_exception(self.error)
+        else:
+            self.future.set_result(self.result)
+
+
+class GroupCommitter:
+    """
+    Coalesces concurrent mutations of a JSON array file into a single durable write.
+    Callers submit a mutation and block until it has been applied and flushed. A background thread takes a copy of
+    the file contents once per batch, applies every queued mutation in order, and writes the result once with a
+    single fsync. The written list is then published to the read cache.
+    Batches close after `max_delay` seconds or `max_batch` mutations, whichever comes first; mutations that arrive
+    while a batch is being flushed simply join the next one, so the batch size grows with the load.
+    A batch in which no mutation changed anything, such as a repeated request, is not written at all.
+    `after_flush` receives the deltas of the batch in the order the mutations were applied, while the file lock is
+    still held, so indexes derived from the file can follow it change by change in commit order.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_batch: int = 64,
+        max_delay: float = 0.002,
+        before_flush: Optional[Callable[[], None]] = None,
+        after_flush: Optional[Callable[[FileIdentity, List[Any]], None]] = None,
+    ) -> None:
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.before_flush = before_flush
+        self.after_flush = after_flush
+        self.flushes = 0
+        self.mutations = 0
+        self._queue: Deque[PendingWrite] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, mutation: Mutation) -> Any:
+        """
+        Applies `mutation` to the file contents and waits until the change is durable.
+        Args:
+            mutation (Mutation): A function that receives the list stored in the file, modifies it in place,
+                and returns the caller's result wrapped in `Applied`, with `changed=False` if it left the list as it
+                was. It should validate its input before modifying the list, and it must append or replace elements
+                rather than modify them, since the elements are shared with readers.
+        Returns:
+            Any: The result returned by `mutation`.
+        Raises:
+            Exception: Whatever `mutation` raised, or the error that prevented the batch from being written.
+        """
+
+        pending = PendingWrite(mutation)
+        self._enqueue(pending)
+
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    async def submit_async(self, mutation: Mutation) -> Any:
+        """
+        Like `submit`, but for callers on an event loop. The mutation is queued and the caller awaits a future that
+        the committer thread resolves, so no thread is held while the write is pending and the batch size is not
+        limited by the size of a thread pool.
+        Args:
+            mutation (Mutation): See `submit`.
+        Returns:
+            Any: The result returned by `mutation`.
+        Raises:
+            Exception: Whatever `mutation` raised, or the error that prevented the batch from being written.
+        """
+
+        pending = PendingWrite(mutation, asyncio.get_running_loop().create_future())
+        self._enqueue(pending)
+        return await pending.future
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns how many mutations were committed and how many file writes it took.
+        """
+
+        with self._cond:
+            return {
+                "mutations": self.mutations,
+                "flushes": self.flushes,
+                "mutations_per_flush": self.mutations / self.flushes if self.flushes else 0,
+            }
+
+    def _enqueue(self, pending: PendingWrite) -> None:
+        with self._cond:
+            self._queue.append(pending)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"group-commit:{self.path}", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+
+                deadline = time.monotonic() + self.max_delay
+                while len(self._queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+
+            self._commit(batch)
+
+    def _commit(self, batch: List[PendingWrite]) -> None:
+        try:
+            with file_lock(self.path):
+                if self.before_flush:
+                    self.before_flush()
+
+                # A shallow copy is enough, mutations only append or replace elements
+                try:
+                    records = list(read_json_cached(self.path))
+                except json.JSONDecodeError:
+                    # An empty or invalid file is treated as holding no records, like the readers do
+                    records = []
+
+                changed = False
+                deltas = []
+                for pending in batch:
+                    try:
+                        applied = pending.mutation(records)
+                    except Exception as e:
+                        pending.error = e
+                    else:
+                        pending.result = applied.result
+                        changed = changed or applied.changed
+                        if applied.delta is not None:
+                            deltas.append(applied.delta)
+
+                if changed:
+                    # Runs on the committer thread, so the flush is a trace of its own
+                    with span("storage.flush", path=self.path, batch=len(batch)):
+                        identity = write_json_atomic(self.path, records)
+                    cache_json(self.path, identity, records)
+
+                    if self.after_flush:
+                        self.after_flush(identity, deltas)
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+        else:
+            with self._cond:
+                if changed:
+                    self.flushes += 1
+                self.mutations += len(batch)
+        finally:
+            for pending in batch:
+                pending.settle()
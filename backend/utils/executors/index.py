@@ -0,0 +1,32 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+def bounded_executor(name: str, env: str, default: int) -> ThreadPoolExecutor:
+    """
+    Creates a thread pool for one kind of blocking work, so that work cannot take every thread of the default
+    executor that `asyncio.to_thread` uses for storage reads.
+    Args:
+        name (str): The prefix of the pool's thread names, e.g. "bcrypt".
+        env (str): The environment variable that overrides the number of threads.
+        default (int): The number of threads when the environment variable is not set.
+    Returns:
+        ThreadPoolExecutor: The pool.
+    """
+
+    return ThreadPoolExecutor(max_workers=max(1, int(os.getenv(env, str(default)))), thread_name_prefix=name)
+
+
+async def run_in_executor(executor: ThreadPoolExecutor, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Runs a blocking function in `executor` and waits for it without blocking the event loop.
+    Like `asyncio.to_thread`, the function runs in a copy of the caller's context, so its spans join the caller's trace.
+    """
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args))
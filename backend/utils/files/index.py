@@ -0,0 +1,310 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, writes are then only serialized within the process
+    fcntl = None
+
+FileIdentity = Tuple[int, int, int]
+
+_file_locks: Dict[str, "FileLock"] = {}
+_file_locks_guard = threading.Lock()
+
+# Parsed contents of data files, keyed by path and tagged with the identity of the file they were read from
+_json_cache: Dict[str, Tuple[FileIdentity, Any]] = {}
+_json_cache_lock = threading.Lock()
+
+
+def file_identity(path: str) -> FileIdentity:
+    """
+    Returns a cheap fingerprint of a file that changes whenever the file is rewritten.
+    Args:
+        path (str): The file to fingerprint.
+    Returns:
+        FileIdentity: The inode, size and modification time (in nanoseconds) of the file.
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def read_json_cached(path: str) -> Any:
+    """
+    Returns the parsed contents of a JSON file, re-reading it only when its identity has changed.
+    Every call costs one `stat`, so changes made by other workers or by hand are still picked up on the next read.
+    The returned value is shared between callers and must be treated as read-only.
+    Args:
+        path (str): The JSON file to read.
+    Returns:
+        Any: The parsed contents of the file.
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If the file does not contain valid JSON.
+    """
+
+    identity = file_identity(path)
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == identity:
+        return cached[1]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+        # Tag the data with the identity of the file that was actually read, in case it was replaced meanwhile
+        identity = _fd_identity(f.fileno())
+    data = json.loads(raw)
+
+    with _json_cache_lock:
+        _json_cache[path] = (identity, data)
+    return data
+
+
+def cache_json(path: str, identity: FileIdentity, data: Any) -> None:
+    """
+    Stores data that was just written to `path` in the read cache, so the next read does not parse the file again.
+    Args:
+        path (str): The file that was written.
+        identity (FileIdentity): The identity of the written file, as returned by `write_json_atomic`.
+        data (Any): The data that was written. It must not be modified afterwards.
+    Returns:
+        None
+    """
+
+    with _json_cache_lock:
+        _json_cache[path] = (identity, data)
+
+
+def _fd_identity(fd: int) -> FileIdentity:
+    stat = os.fstat(fd)
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def write_text_atomic(path: str, content: str) -> FileIdentity:
+    """
+    Writes text to a temporary file next to `path`, flushes it to disk and renames it into place,
+    so readers never see a partially written file.
+    Args:
+        path (str): The destination file.
+        content (str): The text to write.
+    Returns:
+        FileIdentity: The identity of the written file.
+    """
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+        identity = _fd_identity(f.fileno())
+    os.replace(tmp_path, path)
+    return identity
+
+
+def write_json_atomic(path: str, data: Any) -> FileIdentity:
+    """
+    Writes JSON atomically, formatted like the rest of the data files. See `write_text_atomic`.
+    Args:
+        path (str): The destination file.
+        data (Any): The JSON serializable data to write.
+    Returns:
+        FileIdentity: The identity of the written file.
+    """
+
+    return write_text_atomic(path, json.dumps(data, indent=4))
+
+
+class FileLock:
+    """
+    Serializes read-modify-write cycles on a data file, between threads and between processes.
+    Threads of one process take a reentrant lock. The thread holding it also takes an exclusive `flock` on a
+    `<path>.lock` sidecar file, so a backend process that is being handed over to does not overwrite
+    a write made by the other one. The sidecar is used because the data file itself is replaced on every write.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.lock_path = f"{path}.lock"
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "FileLock":
+        self._lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(fd)
+                    raise
+            except BaseException:
+                self._lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
+
+
+def file_lock(path: str) -> FileLock:
+    """
+    Returns the lock that serializes read-modify-write cycles on a data file. See `FileLock`.
+    Args:
+        path (str): The data file.
+    Returns:
+        FileLock: The same lock for every call with the same path.
+    """
+
+    with _file_locks_guard:
+        return _file_locks.setdefault(path, FileLock(path))
+
+
+class DerivedIndex:
+    """
+    Base class of in-memory indexes derived from a set of data files and kept up to date incrementally by writers.
+    The index is tagged with the identities of the files it reflects. `ensure_fresh` rebuilds it when a file was
+    changed by anyone else, and writers call `mark_synced` after applying their own change to it.
+    Subclasses implement `_rebuild`, which recomputes the index from the files; it is called with `_lock` held.
+    """
+
+    def __init__(self, paths: List[str]) -> None:
+        self.paths = list(paths)
+        self.identities: Optional[Tuple[FileIdentity, ...]] = None
+        self._lock = threading.RLock()
+
+    def ensure_fresh(self) -> None:
+        """
+        Rebuilds the index if one of its files was changed since the index last reflected it.
+        Raises:
+            FileNotFoundError: If one of the files does not exist.
+        """
+
+        identities = tuple(file_identity(path) for path in self.paths)
+        if identities == self.identities:
+            return
+
+        with self._lock:
+            if identities != self.identities:
+                self._reload()
+
+    def mark_synced(self, path: str, identity: Optional[FileIdentity] = None) -> None:
+        """
+        Records that the index reflects the current contents of a file, after a write whose changes were
+        applied incrementally.
+        Args:
+            path (str): The file that was written.
+            identity (Optional[FileIdentity]): The identity of the written file. The file is stat'ed when omitted.
+        """
+
+        with self._lock:
+            if self.identities is not None:
+                identities = list(self.identities)
+                identities[self.paths.index(path)] = identity or file_identity(path)
+                self.identities = tuple(identities)
+
+    def _reload(self) -> None:
+        # The identities are taken before reading, so a write that lands during the rebuild triggers another one
+        identities = tuple(file_identity(path) for path in self.paths)
+        self._rebuild()
+        self.identities = identities
+
+    def _rebuild(self) -> None:
+        raise NotImplementedError
+
+
+def dumps_json_array(records: List[Any]) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Serializes a list exactly like `json.dump(records, f, indent=4)` and reports where every element ends up.
+    This lets writers keep offset indexes up to date without re-parsing the file they just wrote.
+    Args:
+        records (List[Any]): The elements of the JSON array.
+    Returns:
+        Tuple[str, List[Tuple[int, int]]]: The serialized array and, for every element, its byte offset and length.
+    """
+
+    if not records:
+        return "[]", []
+
+    parts = ["[\n    "]
+    spans = []
+    position = len(parts[0])
+    for i, record in enumerate(records):
+        if i:
+            parts.append(",\n    ")
+            position += 6
+        element = json.dumps(record, indent=4).replace("\n", "\n    ")
+        parts.append(element)
+        # ensure_ascii is on, so the string length is also the byte length
+        spans.append((position, len(element)))
+        position += len(element)
+    parts.append("\n]")
+    return "".join(parts), spans
+
+
+def scan_json_array(path: str) -> List[Tuple[Any, int, int]]:
+    """
+    Parses a file holding a JSON array and records where every element lives in the file.
+    Args:
+        path (str): The file to scan.
+    Returns:
+        List[Tuple[Any, int, int]]: For every element, the parsed value, its byte offset and its length in bytes.
+            An empty or invalid file yields an empty list.
+    """
+
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    text = raw.decode("utf-8")
+    # json.dump escapes non-ASCII by default, so character and byte offsets normally coincide
+    is_ascii = len(text) == len(raw)
+    decoder = json.JSONDecoder()
+
+    def skip_whitespace(pos: int) -> int:
+        while pos < len(text) and text[pos] in " \t\r\n":
+            pos += 1
+        return pos
+
+    pos = skip_whitespace(0)
+    if pos >= len(text) or text[pos] != "[":
+        return []
+    pos += 1
+
+    elements = []
+    byte_pos = pos
+    char_pos = pos
+    while True:
+        pos = skip_whitespace(pos)
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            value, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return []
+
+        if is_ascii:
+            offset, length = pos, end - pos
+        else:
+            byte_pos += len(text[char_pos:pos].encode("utf-8"))
+            length = len(text[pos:end].encode("utf-8"))
+            offset = byte_pos
+            byte_pos += length
+            char_pos = end
+        elements.append((value, offset, length))
+
+        pos = skip_whitespace(end)
+        if pos < len(text) and text[pos] == ",":
+            pos += 1
+
+    return elements
+
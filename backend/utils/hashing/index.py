@@ -0,0 +1,118 @@
+import statistics
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import bcrypt
+
+DEFAULT_ROUNDS = 12
+# Calibration never goes below this cost, however slow the host is
+MIN_ROUNDS = 10
+MAX_ROUNDS = 20
+
+
+def hash_rounds(hashed: str) -> int:
+    """
+    Returns the cost factor a bcrypt hash was created with.
+    Args:
+        hashed (str): A bcrypt hash, e.g. "$2b$12$...".
+    Returns:
+        int: The cost factor, or 0 if the hash is not in the bcrypt format.
+    """
+
+    parts = hashed.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return 0
+    return int(parts[2])
+
+
+def measure_verify_ms(rounds: int, samples: int = 3) -> float:
+    """
+    Measures how long verifying a password against a hash of the given cost takes on this host.
+    Args:
+        rounds (int): The bcrypt cost factor.
+        samples (int): The number of verifications to time.
+    Returns:
+        float: The median verification time in milliseconds.
+    """
+
+    hashed = bcrypt.hashpw(b"calibration password", bcrypt.gensalt(rounds))
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.checkpw(b"calibration password", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_rounds(target_ms: float, samples: int = 3) -> Tuple[int, List[Tuple[int, float]]]:
+    """
+    Picks the highest bcrypt cost whose verification time stays within `target_ms` on this host.
+    Each extra round doubles the work, so costs are timed from MIN_ROUNDS upwards until the target is exceeded.
+    Args:
+        target_ms (float): The verification latency to stay within, in milliseconds.
+        samples (int): The number of verifications to time for each cost.
+    Returns:
+        Tuple[int, List[Tuple[int, float]]]: The chosen cost, never below MIN_ROUNDS, and the measured
+            (cost, milliseconds) pairs.
+    """
+
+    rounds = MIN_ROUNDS
+    timings = []
+    for candidate in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure_verify_ms(candidate, samples)
+        timings.append((candidate, elapsed))
+        if elapsed > target_ms:
+            break
+        rounds = candidate
+    return rounds, timings
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies passwords with bcrypt at a configurable cost.
+    Hashes made with a lower cost than the configured one still verify, and `needs_rehash` tells the caller to
+    replace them, so raising the cost upgrades existing accounts as their users log in.
+    """
+
+    def __init__(self, rounds: int = DEFAULT_ROUNDS) -> None:
+        self.rounds = rounds
+        self.rehashed = 0
+        self._lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        """
+        Hashes a password at the configured cost.
+        """
+
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)).decode()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """
+        Checks a password against a bcrypt hash of any cost.
+        """
+
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Returns whether a hash was made with a lower cost than the configured one.
+        """
+
+        return hash_rounds(hashed) < self.rounds
+
+    def record_rehash(self) -> None:
+        """
+        Counts a hash that was upgraded to the configured cost.
+        """
+
+        with self._lock:
+            self.rehashed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the configured cost and the number of hashes upgraded on login.
+        """
+
+        with self._lock:
+            return {"rounds": self.rounds, "rehashed": self.rehashed}
@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+class StoredResponse:
+    """
+    A cached outcome for one idempotency key: the fingerprint of the request that produced it and, once the request
+    has finished, the response to replay. `done` is set when the request finishes, whether or not it was stored.
+    """
+
+    __slots__ = ("fingerprint", "status", "headers", "body", "expires", "done")
+
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        self.status: Optional[int] = None
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.body = b""
+        self.expires = float("inf")
+        self.done = asyncio.Event()
+
+
+class IdempotencyCache:
+    """
+    Bounded in-process cache of responses keyed by endpoint and idempotency key.
+    Entries expire `ttl` seconds after they were stored. When more than `max_keys` entries are held, the oldest ones
+    are evicted first, so a flood of distinct keys cannot exhaust memory.
+    """
+
+    def __init__(self, ttl: float, max_keys: int = 2048) -> None:
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.replayed = 0
+        self.executed = 0
+        self.conflicts = 0
+        self._entries: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: Tuple[str, str], fingerprint: str) -> Tuple[Optional[StoredResponse], bool]:
+        """
+        Looks up the entry of `key`, or creates one if there is none.
+        Args:
+            key (Tuple[str, str]): The request path and the client's idempotency key.
+            fingerprint (str): A hash of the request, used to detect a key being reused for a different request.
+        Returns:
+            Tuple[Optional[StoredResponse], bool]: The entry, and whether the caller created it and must now execute
+                the request. The entry is None if the key belongs to a request with a different fingerprint.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                if entry.fingerprint != fingerprint:
+                    self.conflicts += 1
+                    return None, False
+                return entry, False
+
+            entry = StoredResponse(fingerprint)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            return entry, True
+
+    def store(self, key: Tuple[str, str], entry: StoredResponse) -> None:
+        """
+        Keeps a finished response so retries of the same request can be answered from the cache.
+        """
+
+        with self._lock:
+            entry.expires = time.monotonic() + self.ttl
+            self.executed += 1
+        entry.done.set()
+
+    def discard(self, key: Tuple[str, str], entry: StoredResponse) -> None:
+        """
+        Forgets a request that failed, so a retry executes it again.
+        """
+
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            self.executed += 1
+        entry.done.set()
+
+    def mark_replayed(self) -> None:
+        """
+        Counts a request that was answered from the cache.
+        """
+
+        with self._lock:
+            self.replayed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache configuration and how many requests were executed, replayed, or rejected as conflicts.
+        """
+
+        with self._lock:
+            return {
+                "ttl_seconds": self.ttl,
+                "max_keys": self.max_keys,
+                "keys": len(self._entries),
+                "executed": self.executed,
+                "replayed": self.replayed,
+                "conflicts": self.conflicts,
+            }
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_keys and entry.expires > now:
+                break
+            del self._entries[key]
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware that makes POST requests carrying an `Idempotency-Key` header safe to retry.
+    The first request with a key is executed and its response is stored. A retry with the same key and body gets the
+    stored response back, marked with an `Idempotent-Replayed` header, without reaching the endpoint or storage.
+    A retry that arrives while the first request is still running waits for it instead of running concurrently.
+    Reusing a key with a different body is rejected with status 422. Responses with a 5xx status are not stored,
+    so a failed request can be retried.
+    """
+
+    def __init__(self, app: ASGIApp, cache: IdempotencyCache, paths: Iterable[str]) -> None:
+        self.app = app
+        self.cache = cache
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = Headers(scope=scope).get(IDEMPOTENCY_HEADER)
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await self.send_error(send, 400, f"Idempotency-Key must be between 1 and {MAX_KEY_LENGTH} characters.")
+            return
+
+        body = await self.read_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        key = (scope["path"], idempotency_key)
+
+        while True:
+            entry, is_owner = self.cache.claim(key, fingerprint)
+            if is_owner:
+                break
+            if entry is None:
+                await self.send_error(send, 422, "Idempotency-Key was already used with a different request.")
+                return
+
+            await entry.done.wait()
+            if entry.status is not None:
+                self.cache.mark_replayed()
+                await self.replay(entry, send)
+                return
+            # The first request failed and was discarded, claim the key again
+
+        await self.execute(scope, receive, send, body, key, entry)
+
+    async def execute(
+        self, scope: Scope, receive: Receive, send: Send, body: bytes, key: Tuple[str, str], entry: StoredResponse
+    ) -> None:
+        """
+        Runs the request and stores its response, or discards the entry if the request failed.
+        """
+
+        body_sent = False
+        status: Optional[int] = None
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_and_keep(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_and_keep)
+        except BaseException:
+            self.cache.discard(key, entry)
+            raise
+
+        if status is None or status >= 500:
+            self.cache.discard(key, entry)
+            return
+
+        entry.status, entry.headers, entry.body = status, headers, b"".join(chunks)
+        self.cache.store(key, entry)
+
+    async def read_body(self, receive: Receive) -> bytes:
+        """
+        Reads the whole request body, which is needed to fingerprint the request.
+        """
+
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def replay(self, entry: StoredResponse, send: Send) -> None:
+        """
+        Sends a stored response.
+        """
+
+        await send({
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": [*entry.headers, (b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def send_error(self, send: Send, status: int, message: str) -> None:
+        """
+        Sends an error in the API's usual JSON shape.
+        """
+
+        body = json.dumps({"message": message, "data": None}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,104 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import AbstractSet, Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    The state of one key's bucket: the tokens left and when they were last refilled.
+    """
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float) -> None:
+        self.tokens = capacity
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    In-process token-bucket rate limiter keyed by an arbitrary string, such as an email or a client address.
+    Only the `max_keys` most recently used buckets are kept, so a flood of distinct keys cannot exhaust memory.
+    Allowed and rejected requests are counted so they can be exposed as metrics.
+    """
+
+    def __init__(self, capacity: float, per_minute: float, max_keys: int = 10000) -> None:
+        self.capacity = capacity
+        self.rate = per_minute / 60
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> Tuple[bool, int]:
+        """
+        Takes one token from the bucket of `key`.
+        Args:
+            key (str): The key to rate limit on.
+        Returns:
+            Tuple[bool, int]: Whether the request is allowed and, if not, the number of seconds until a token is available.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.capacity, now)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                self.allowed += 1
+                return True, 0
+
+            self.rejected += 1
+            retry_after = math.ceil((1 - bucket.tokens) / self.rate) if self.rate > 0 else 60
+            return False, retry_after
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns the limiter's configuration and counters.
+        """
+
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "per_minute": self.rate * 60,
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "tracked_keys": len(self._buckets),
+            }
+
+
+def client_address(peer: Optional[str], forwarded_for: Optional[str], trusted_proxies: AbstractSet[str]) -> str:
+    """
+    Returns the address of the end user a request comes from, to rate limit on.
+    The `X-Forwarded-For` header is only believed for the hops added by trusted proxies, such as the Streamlit
+    frontend, which forwards the address of the browser it serves. Walking the chain from the connection backwards,
+    the first address that is not a trusted proxy is the client, so a client cannot pick its own key by sending
+    the header itself.
+    Args:
+        peer (Optional[str]): The address of the connection, None if unknown.
+        forwarded_for (Optional[str]): The `X-Forwarded-For` header of the request, if any.
+        trusted_proxies (AbstractSet[str]): The addresses whose `X-Forwarded-For` entries are trusted.
+    Returns:
+        str: The client address, "unknown" if the connection address is unknown.
+    """
+
+    if peer is None:
+        return "unknown"
+
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()] if forwarded_for else []
+    address = peer
+    while address in trusted_proxies and hops:
+        address = hops.pop()
+    return address
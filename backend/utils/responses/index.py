@@ -0,0 +1,195 @@
+import gzip
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Parses a comma separated `fields=` query parameter into a list of field names.
+    Args:
+        fields (Optional[str]): The raw query parameter, e.g. "id,title,credit_hours".
+        allowed (Iterable[str]): The field names that may be selected.
+    Returns:
+        Optional[List[str]]: The selected field names in request order, or None if no projection was requested.
+    Raises:
+        ValueError: If any requested field is not in `allowed`.
+    """
+
+    if not fields:
+        return None
+
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+
+def project(records: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Keeps only the selected fields of every record.
+    Args:
+        records (List[Dict[str, Any]]): The records to project.
+        fields (Optional[List[str]]): The field names to keep, or None to keep every field.
+    Returns:
+        List[Dict[str, Any]]: The projected records.
+    """
+
+    if fields is None:
+        return records
+    return [{f: record.get(f) for f in fields} for record in records]
+
+
+def wants_arrow(accept: str) -> bool:
+    """
+    Tells whether a client asked for an Arrow IPC stream.
+    Args:
+        accept (str): The raw Accept header.
+    Returns:
+        bool: True if the response should be an Arrow IPC stream.
+    """
+
+    return ARROW_STREAM in accept
+
+
+def flatten(record: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """
+    Flattens nested dicts into prefixed columns, e.g. {"teacher": {"name": ...}} into {"teacher_name": ...}.
+    """
+
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}_"))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def arrow_response(records: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> Response:
+    """
+    Builds an Arrow IPC stream response from a list of records, one column per (flattened) field.
+    Args:
+        records (List[Dict[str, Any]]): The rows of the table.
+        metadata (Optional[Dict[str, Any]]): Extra values, such as a total count, stored JSON encoded in the schema metadata.
+    Returns:
+        Response: The response carrying the Arrow stream.
+    """
+
+    # Imported when the first Arrow response is built, to keep startup fast
+    import pyarrow as pa
+
+    rows = [flatten(record) for record in records]
+    names: Dict[str, None] = {}
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    table = pa.table({name: [row.get(name) for row in rows] for name in names})
+    if metadata:
+        table = table.replace_schema_metadata({key: json.dumps(value) for key, value in metadata.items()})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW_STREAM)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the response encoding from an Accept-Encoding header.
+    Brotli is preferred when the client accepts it and the `brotli` package is installed, gzip otherwise.
+    Args:
+        accept_encoding (str): The raw Accept-Encoding header.
+    Returns:
+        Optional[str]: "br", "gzip" or None if the client accepts neither.
+    """
+
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses response bodies with brotli or gzip, negotiated through Accept-Encoding.
+    Bodies smaller than `minimum_size` bytes are sent as they are, since compressing them costs more than it saves.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start)
+            if len(body) >= self.minimum_size and "content-encoding" not in headers:
+                body = self.compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Compresses a response body with the negotiated encoding.
+        """
+
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
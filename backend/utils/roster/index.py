@@ -0,0 +1,84 @@
+import itertools
+import json
+from typing import Dict, List, Tuple
+
+from backend.utils.files.index import DerivedIndex, read_json_cached
+
+
+def roster_entry(user: dict) -> dict:
+    """
+    Returns the public fields of a user that are shown on a course roster.
+    """
+
+    return {"id": user["id"], "name": user["name"], "email": user["email"]}
+
+
+class RosterIndex(DerivedIndex):
+    """
+    Reverse index from course ids to the students enrolled in them.
+    It is built from the user files (one per shard) once, then kept up to date incrementally by the enrollment functions.
+    The index is tagged with the identities of the files it reflects and is rebuilt if a file is changed by anyone else.
+    """
+
+    def __init__(self, paths: List[str]) -> None:
+        super().__init__(paths)
+        self.students: Dict[str, Dict[str, dict]] = {}
+
+    def add(self, course_id: str, user: dict) -> None:
+        """
+        Records that `user` is enrolled in the course.
+        """
+
+        with self._lock:
+            self.students.setdefault(course_id, {})[user["id"]] = roster_entry(user)
+
+    def remove(self, course_id: str, user_id: str) -> None:
+        """
+        Records that the user is no longer enrolled in the course.
+        """
+
+        with self._lock:
+            enrolled = self.students.get(course_id)
+            if enrolled is not None:
+                enrolled.pop(user_id, None)
+                if not enrolled:
+                    del self.students[course_id]
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the number of students enrolled in every course that has at least one student.
+        """
+
+        self.ensure_fresh()
+        with self._lock:
+            return {course_id: len(enrolled) for course_id, enrolled in self.students.items()}
+
+    def page(self, course_id: str, offset: int, limit: int) -> Tuple[List[dict], int]:
+        """
+        Returns one page of the students enrolled in the course, in enrollment order.
+        Args:
+            course_id (str): The id of the course.
+            offset (int): The number of students to skip.
+            limit (int): The maximum number of students to return.
+        Returns:
+            Tuple[List[dict], int]: The students on the page and the total number of enrolled students.
+        """
+
+        self.ensure_fresh()
+        with self._lock:
+            enrolled = self.students.get(course_id, {})
+            return list(itertools.islice(enrolled.values(), offset, offset + limit)), len(enrolled)
+
+    def _rebuild(self) -> None:
+        students: Dict[str, Dict[str, dict]] = {}
+        for path in self.paths:
+            try:
+                users = read_json_cached(path)
+            except json.JSONDecodeError:
+                users = []
+
+            for user in users:
+                for course in user.get("enrolled_courses") or []:
+                    students.setdefault(course["id"], {})[user["id"]] = roster_entry(user)
+
+        self.students = students
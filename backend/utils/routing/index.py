@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+import functools
+import time
+from typing import Any, Callable, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.utils.tracing.index import (
+    TRACING_ENABLED,
+    current_span_id,
+    current_trace_id,
+    new_span_id,
+    parse_traceparent,
+    record,
+    span,
+)
+
+_route_started: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("route_started", default=None)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that records a root span for every HTTP request.
+    The trace is continued from the caller's `traceparent` header when present, and the trace id is returned
+    in the `X-Trace-Id` response header.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        parent = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        with span(f"request.{scope['method']} {scope['path']}", parent=parent) as attributes:
+            trace_id = current_trace_id()
+
+            async def send_with_trace_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    attributes["status"] = message["status"]
+                    MutableHeaders(scope=message)["X-Trace-Id"] = trace_id
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
+
+
+class TracedRoute(APIRoute):
+    """
+    FastAPI route that records a span for the whole route, a "validation" span for request parsing and validation,
+    and a "handler" span for the endpoint function itself.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any) -> None:
+        super().__init__(path, trace_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+        name = f"route.{self.name}"
+
+        async def traced_route_handler(request: Any) -> Any:
+            token = _route_started.set(time.time_ns())
+            try:
+                with span(name, path=self.path):
+                    return await route_handler(request)
+            finally:
+                _route_started.reset(token)
+
+        return traced_route_handler
+
+
+def trace_endpoint(endpoint: Callable) -> Callable:
+    """
+    Wraps an endpoint so its own execution is recorded as a "handler" span, and the time between the route being
+    entered and the endpoint being called is recorded as a "validation" span.
+    The wrapper keeps the endpoint's signature, so FastAPI still sees the original parameters.
+    """
+
+    name = f"handler.{endpoint.__name__}"
+
+    def record_validation() -> None:
+        started = _route_started.get()
+        if TRACING_ENABLED and started is not None:
+            record("validation", started, time.time_ns(), current_trace_id(), new_span_id(), current_span_id(), {})
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            record_validation()
+            with span(name):
+                return await endpoint(*args, **kwargs)
+
+        return async_endpoint
+
+    @functools.wraps(endpoint)
+    def sync_endpoint(*args: Any, **kwargs: Any) -> Any:
+        record_validation()
+        with span(name):
+            return endpoint(*args, **kwargs)
+
+    return sync_endpoint
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils.files.index import read_json_cached
+
+
+def shard_paths(path: str, count: int) -> List[str]:
+    """
+    Returns the data files of a layout with `count` shards.
+    A single shard is the unsharded file itself, so existing data needs no migration.
+    Args:
+        path (str): The unsharded data file, e.g. "backend/db/users.json".
+        count (int): The number of shards.
+    Returns:
+        List[str]: The shard files, e.g. "backend/db/users.0-of-4.json" for the first of 4 shards.
+    """
+
+    if count == 1:
+        return [path]
+    root, ext = os.path.splitext(path)
+    return [f"{root}.{i}-of-{count}{ext}" for i in range(count)]
+
+
+def shard_of(user_id: str, count: int) -> int:
+    """
+    Returns the shard a user is stored in. CRC-32 is used because, unlike `hash`, it is stable across processes.
+    """
+
+    return zlib.crc32(user_id.encode()) % count
+
+
+def read_manifest(manifest_path: str) -> int:
+    """
+    Returns the number of shards recorded in the manifest, 1 if there is no manifest.
+    """
+
+    if not os.path.exists(manifest_path):
+        return 1
+    with open(manifest_path, "r") as f:
+        return int(json.load(f)["shards"])
+
+
+class UserShards:
+    """
+    Users partitioned across several JSON array files by a hash of their id.
+    Every shard is written through its own lock and group committer, so writes for users in different shards do
+    not wait for each other, and a write only rewrites the users of one shard.
+    Each shard has an id and email index, rebuilt whenever the cached contents of the shard change.
+    The number of shards is read from a manifest written by `backend/reshard_users.py`.
+    """
+
+    def __init__(self, path: str, manifest_path: str) -> None:
+        self.path = path
+        self.manifest_path = manifest_path
+        self.count = read_manifest(manifest_path)
+        self.paths = shard_paths(path, self.count)
+        self._lookups: Dict[str, Tuple[list, Dict[str, int], Dict[str, int]]] = {}
+        self._all: Optional[Tuple[List[list], list]] = None
+        self._lock = threading.Lock()
+
+    def path_for(self, user_id: str) -> str:
+        """
+        Returns the shard file that holds the user with this id.
+        """
+
+        return self.paths[shard_of(user_id, self.count)]
+
+    def missing(self) -> Optional[str]:
+        """
+        Returns the first shard file that does not exist, or None if they all do.
+        """
+
+        for path in self.paths:
+            if not os.path.exists(path):
+                return path
+        return None
+
+    def read(self, path: str) -> list:
+        """
+        Returns the users stored in one shard. The list is shared with other callers and must not be modified.
+        Raises:
+            FileNotFoundError: If the shard file does not exist.
+        """
+
+        try:
+            return read_json_cached(path)
+        except json.JSONDecodeError:
+            return []
+
+    def read_all(self) -> list:
+        """
+        Returns the users of every shard, in shard order.
+        The combined list is kept until one of the shards changes. It is shared and must not be modified.
+        Raises:
+            FileNotFoundError: If a shard file does not exist.
+        """
+
+        if self.count == 1:
+            return self.read(self.path)
+
+        shards = [self.read(path) for path in self.paths]
+        cached = self._all
+        if cached is not None and all(old is new for old, new in zip(cached[0], shards)):
+            return cached[1]
+
+        combined = [user for users in shards for user in users]
+        self._all = (shards, combined)
+        return combined
+
+    def find_by_id(self, user_id: str) -> Optional[dict]:
+        """
+        Returns the user with this id, looking only at the shard that can hold it.
+        """
+
+        users, by_id, _ = self._lookup(self.path_for(user_id))
+        position = by_id.get(user_id)
+        return users[position] if position is not None else None
+
+    def find_by_email(self, email: str) -> Optional[dict]:
+        """
+        Returns the user with this email, with one index lookup per shard.
+        """
+
+        for path in self.paths:
+            users, _, by_email = self._lookup(path)
+            position = by_email.get(email)
+            if position is not None:
+                return users[position]
+        return None
+
+    def _lookup(self, path: str) -> Tuple[list, Dict[str, int], Dict[str, int]]:
+        users = self.read(path)
+        lookup = self._lookups.get(path)
+        if lookup is not None and lookup[0] is users:
+            return lookup
+
+        lookup = (
+            users,
+            {user["id"]: position for position, user in enumerate(users)},
+            {user["email"]: position for position, user in enumerate(users)},
+        )
+        with self._lock:
+            self._lookups[path] = lookup
+        return lookup
@@ -0,0 +1,237 @@
+import json
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.utils.files.index import DerivedIndex, read_json_cached
+
+
+class StatsState:
+    """
+    Enrollment aggregates: students per course, credit hours per student and the load of every teacher.
+    Every update is idempotent, so applying a change that is already reflected leaves the aggregates unchanged.
+    """
+
+    def __init__(self) -> None:
+        self.courses: Dict[str, Dict[str, Any]] = {}
+        self.teachers: Dict[str, Dict[str, Any]] = {}
+        self.enrollments: Dict[str, Dict[str, int]] = {}
+        self.distribution: Counter = Counter()
+        self.total_enrollments = 0
+
+    def add_course(self, course: dict) -> None:
+        """
+        Records a course and counts it towards its teacher's load.
+        """
+
+        if course["id"] in self.courses:
+            return
+
+        teacher = course["teacher"]
+        teacher_id = str(teacher["id"])
+        self.courses[course["id"]] = {
+            "id": course["id"],
+            "title": course["title"],
+            "teacher_id": teacher_id,
+            "credit_hours": course["credit_hours"],
+            "enrolled": 0,
+        }
+        load = self.teachers.setdefault(
+            teacher_id,
+            {"id": teacher_id, "name": teacher.get("name"), "courses": 0, "enrollments": 0, "student_credit_hours": 0},
+        )
+        load["courses"] += 1
+
+    def add_student(self, user_id: str) -> None:
+        """
+        Records a student with no enrollments.
+        """
+
+        if user_id in self.enrollments:
+            return
+        self.enrollments[user_id] = {}
+        self.distribution[0] += 1
+
+    def enroll(self, user_id: str, course: dict) -> None:
+        """
+        Records that a student enrolled in a course, counting the credit hours of the given course record.
+        """
+
+        self.add_student(user_id)
+        enrolled = self.enrollments[user_id]
+        if course["id"] in enrolled:
+            return
+
+        self.add_course(course)
+        credit_hours = course["credit_hours"]
+        self._move_student(user_id, credit_hours)
+        enrolled[course["id"]] = credit_hours
+        self._count_enrollment(course["id"], credit_hours, 1)
+
+    def drop(self, user_id: str, course_id: str) -> None:
+        """
+        Records that a student dropped a course.
+        """
+
+        enrolled = self.enrollments.get(user_id)
+        if enrolled is None or course_id not in enrolled:
+            return
+
+        credit_hours = enrolled[course_id]
+        self._move_student(user_id, -credit_hours)
+        del enrolled[course_id]
+        self._count_enrollment(course_id, credit_hours, -1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the aggregates as JSON serializable lists, busiest courses and teachers first.
+        """
+
+        return {
+            "totals": {
+                "courses": len(self.courses),
+                "students": len(self.enrollments),
+                "enrollments": self.total_enrollments,
+            },
+            "courses": sorted(
+                (dict(course) for course in self.courses.values()),
+                key=lambda course: (-course["enrolled"], course["id"]),
+            ),
+            "credit_hours_distribution": [
+                {"credit_hours": credit_hours, "students": self.distribution[credit_hours]}
+                for credit_hours in sorted(self.distribution)
+            ],
+            "teachers": sorted(
+                (dict(load) for load in self.teachers.values()),
+                key=lambda load: (-load["enrollments"], load["id"]),
+            ),
+        }
+
+    def _move_student(self, user_id: str, credit_hours: int) -> None:
+        previous = sum(self.enrollments[user_id].values())
+        self.distribution[previous] -= 1
+        if not self.distribution[previous]:
+            del self.distribution[previous]
+        self.distribution[previous + credit_hours] += 1
+
+    def _count_enrollment(self, course_id: str, credit_hours: int, delta: int) -> None:
+        course = self.courses.get(course_id)
+        if course is not None:
+            course["enrolled"] += delta
+            load = self.teachers[course["teacher_id"]]
+            load["enrollments"] += delta
+            load["student_credit_hours"] += delta * credit_hours
+        self.total_enrollments += delta
+
+
+def compute_stats(user_files: List[list], courses: list) -> StatsState:
+    """
+    Computes the enrollment aggregates from scratch.
+    Args:
+        user_files (List[list]): The users of every user file.
+        courses (list): Every course in the catalog.
+    Returns:
+        StatsState: The aggregates.
+    """
+
+    state = StatsState()
+    for course in courses:
+        state.add_course(course)
+    for users in user_files:
+        for user in users:
+            if user.get("role") == "student":
+                state.add_student(user["id"])
+            for course in user.get("enrolled_courses") or []:
+                state.enroll(user["id"], course)
+    return state
+
+
+class EnrollmentStats(DerivedIndex):
+    """
+    Enrollment aggregates for the admin statistics, kept up to date incrementally by the functions that create courses
+    and users and change enrollments, so reading them costs nothing per user or enrollment.
+    Like the roster index, the aggregates are tagged with the identities of the files they reflect and are recomputed
+    if a file is changed by anyone else. The serialized snapshot is cached until the next change.
+    """
+
+    def __init__(self, user_paths: List[str], courses_path: str) -> None:
+        super().__init__([*user_paths, courses_path])
+        self.user_paths = list(user_paths)
+        self.courses_path = courses_path
+        self.state = StatsState()
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def add_course(self, course: dict) -> None:
+        """
+        Records a new course.
+        """
+
+        with self._lock:
+            self.state.add_course(course)
+            self._snapshot = None
+
+    def add_student(self, user_id: str) -> None:
+        """
+        Records a new student.
+        """
+
+        with self._lock:
+            self.state.add_student(user_id)
+            self._snapshot = None
+
+    def enroll(self, user_id: str, course: dict) -> None:
+        """
+        Records that a student enrolled in a course.
+        """
+
+        with self._lock:
+            self.state.enroll(user_id, course)
+            self._snapshot = None
+
+    def drop(self, user_id: str, course_id: str) -> None:
+        """
+        Records that a student dropped a course.
+        """
+
+        with self._lock:
+            self.state.drop(user_id, course_id)
+            self._snapshot = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the current aggregates. The result is shared with other callers and must not be modified.
+        """
+
+        self.ensure_fresh()
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self.state.snapshot()
+            return self._snapshot
+
+    def verify(self) -> Tuple[Dict[str, Any], bool]:
+        """
+        Recomputes the aggregates from the data files and compares them with the incrementally maintained ones.
+        If they differ, the recomputed aggregates replace them.
+        Returns:
+            Tuple[Dict[str, Any], bool]: The recomputed aggregates, and whether the incremental ones matched.
+        """
+
+        with self._lock:
+            incremental = self.snapshot()
+            self._reload()
+            recomputed = self.snapshot()
+            return recomputed, recomputed == incremental
+
+    def _rebuild(self) -> None:
+        user_files = []
+        for path in self.user_paths:
+            try:
+                user_files.append(read_json_cached(path))
+            except json.JSONDecodeError:
+                user_files.append([])
+        try:
+            courses = read_json_cached(self.courses_path)
+        except json.JSONDecodeError:
+            courses = []
+
+        self.state = compute_stats(user_files, courses)
+        self._snapshot = None
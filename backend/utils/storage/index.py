@@ -0,0 +1,163 @@
+"""
+Async storage API for the request handlers.
+
+The functions in `backend.utils.users.index` do blocking file I/O and JSON (de)serialization. Awaiting these
+wrappers runs that work in a worker thread instead, so a slow disk or a large write does not stall the event loop
+for unrelated requests. Each wrapper has the same name, arguments and return value as its counterpart.
+User writes go through a group committer and are already coroutines there: they await the commit of their batch
+without holding a worker thread. Course writes run in a small pool of their own. Either way, pending writes never
+take threads away from reads.
+"""
+
+import asyncio
+
+from backend.classes.index import Course, User
+from backend.utils.executors.index import bounded_executor, run_in_executor
+from backend.utils.users import index as users
+
+# Course writes hold courses.json's lock while they rewrite it, so more threads would only wait on the lock
+write_executor = bounded_executor("storage-write", "STORAGE_WRITE_THREADS", 1)
+
+
+async def get_all_users():
+    """
+    Retrieves all user records. See `backend.utils.users.index.get_all_users`.
+    """
+
+    return await asyncio.to_thread(users.get_all_users)
+
+
+async def get_user_by_email(email: str) -> dict | None:
+    """
+    Retrieves a user record by email. See `backend.utils.users.index.get_user_by_email`.
+    """
+
+    return await asyncio.to_thread(users.get_user_by_email, email)
+
+
+async def get_user_by_id(user_id: str) -> dict | None:
+    """
+    Retrieves a user record by id. See `backend.utils.users.index.get_user_by_id`.
+    """
+
+    return await asyncio.to_thread(users.get_user_by_id, user_id)
+
+
+async def create_user(user: User):
+    """
+    Appends a new user to the users.json file, or returns None if the email is taken. See `backend.utils.users.index.create_user`.
+    """
+
+    return await users.create_user(user)
+
+
+async def create_course_in_db(course: Course):
+    """
+    Appends a new course to the courses.json file. See `backend.utils.users.index.create_course_in_db`.
+    """
+
+    return await run_in_executor(write_executor, users.create_course_in_db, course)
+
+
+async def get_all_courses():
+    """
+    Retrieves all courses. See `backend.utils.users.index.get_all_courses`.
+    """
+
+    return await asyncio.to_thread(users.get_all_courses)
+
+
+async def get_course_by_id(course_id: str) -> dict | None:
+    """
+    Retrieves a single course by id. See `backend.utils.users.index.get_course_by_id`.
+    """
+
+    return await asyncio.to_thread(users.get_course_by_id, course_id)
+
+
+async def get_courses_by_teacher(teacher_id: str) -> list[dict]:
+    """
+    Retrieves the courses created by a teacher. See `backend.utils.users.index.get_courses_by_teacher`.
+    """
+
+    return await asyncio.to_thread(users.get_courses_by_teacher, teacher_id)
+
+
+async def update_password_hash(user_id: str, hashed_pwd: str) -> dict | None:
+    """
+    Replaces the password hash of a user. See `backend.utils.users.index.update_password_hash`.
+    """
+
+    return await users.update_password_hash(user_id, hashed_pwd)
+
+
+async def enroll_user_in_course(user: User, course: Course) -> dict[str, str | int]:
+    """
+    Enrolls a user in a course. See `backend.utils.users.index.enroll_user_in_course`.
+    """
+
+    return await users.enroll_user_in_course(user, course)
+
+
+async def delete_course_enrollment_from_user(user: User, course: Course) -> dict[str, str | int]:
+    """
+    Removes a course from a user's enrollments. See `backend.utils.users.index.delete_course_enrollment_from_user`.
+    """
+
+    return await users.delete_course_enrollment_from_user(user, course)
+
+
+async def get_user_enrollments(user_id: str) -> list[dict] | None:
+    """
+    Retrieves the courses a user is enrolled in. See `backend.utils.users.index.get_user_enrollments`.
+    """
+
+    return await asyncio.to_thread(users.get_user_enrollments, user_id)
+
+
+async def get_student_catalog(student_id: str) -> tuple[list[dict], int] | None:
+    """
+    Retrieves every course, flagged for one student. See `backend.utils.users.index.get_student_catalog`.
+    """
+
+    return await asyncio.to_thread(users.get_student_catalog, student_id)
+
+
+async def get_course_students(course_id: str, offset: int, limit: int) -> tuple[list[dict], int]:
+    """
+    Retrieves one page of a course roster. See `backend.utils.users.index.get_course_students`.
+    """
+
+    return await asyncio.to_thread(users.get_course_students, course_id, offset, limit)
+
+
+async def get_enrollment_counts() -> dict[str, int]:
+    """
+    Retrieves enrollment counts for every course. See `backend.utils.users.index.get_enrollment_counts`.
+    """
+
+    return await asyncio.to_thread(users.get_enrollment_counts)
+
+
+async def get_enrollment_stats(verify: bool = False) -> tuple[dict, bool | None]:
+    """
+    Retrieves the enrollment aggregates. See `backend.utils.users.index.get_enrollment_stats`.
+    """
+
+    return await asyncio.to_thread(users.get_enrollment_stats, verify)
+
+
+async def get_changes_since(seq: int, limit: int) -> tuple[list[dict], int, bool]:
+    """
+    Retrieves the changes made after a sequence number. See `backend.utils.users.index.get_changes_since`.
+    """
+
+    return await asyncio.to_thread(users.get_changes_since, seq, limit)
+
+
+async def get_change_version() -> int:
+    """
+    Retrieves the latest change sequence number. See `backend.utils.users.index.get_change_version`.
+    """
+
+    return await asyncio.to_thread(users.get_change_version)
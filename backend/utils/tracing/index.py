@@ -0,0 +1,251 @@
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.utils.files.index import file_lock
+
+# Spans are written in the Chrome trace event format (JSON array of "complete" events), which can be opened
+# offline in Perfetto (https://ui.perfetto.dev) or chrome://tracing. The closing bracket is optional in that
+# format, so events can be appended by several processes without rewriting the file.
+TRACE_FILE = os.getenv("TRACE_FILE", "traces/trace.json")
+# Tracing is opt-in, set TRACING=1 to record spans
+TRACING_ENABLED = os.getenv("TRACING", "0") == "1"
+# Once the trace file reaches this size it is moved to TRACE_FILE.1, replacing the previous one, and a new file is started
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(64 * 1024 * 1024)))
+FLUSH_EVERY = 64
+FLUSH_INTERVAL_SECONDS = 1.0
+
+_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_id", default=None)
+_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("span_id", default=None)
+
+_events: List[Dict[str, Any]] = []
+_events_cond = threading.Condition()
+_flush_requested = False
+_writer: Optional[threading.Thread] = None
+
+
+def new_trace_id() -> str:
+    """
+    Returns a random 128-bit trace id in hex, as used by W3C trace context.
+    """
+
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    """
+    Returns a random 64-bit span id in hex, as used by W3C trace context.
+    """
+
+    return secrets.token_hex(8)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Parses a W3C `traceparent` header.
+    Args:
+        header (Optional[str]): The header value, e.g. "00-<32 hex trace id>-<16 hex parent id>-01".
+    Returns:
+        Optional[Tuple[str, str]]: The trace id and parent span id, or None if the header is missing or invalid.
+    """
+
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def trace_headers() -> Dict[str, str]:
+    """
+    Returns the `traceparent` header to send with an outgoing request.
+    The current span becomes the parent of the callee's spans. Outside of a span, a new trace is started.
+    """
+
+    trace_id = _trace_id.get() or new_trace_id()
+    span_id = _span_id.get() or new_span_id()
+    return {"traceparent": f"00-{trace_id}-{span_id}-01"}
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    Returns the id of the trace the caller is part of, or None outside of a span.
+    """
+
+    return _trace_id.get()
+
+
+def current_span_id() -> Optional[str]:
+    """
+    Returns the id of the innermost open span, or None outside of a span.
+    """
+
+    return _span_id.get()
+
+
+@contextmanager
+def span(name: str, parent: Optional[Tuple[str, str]] = None, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Records the time spent in the block as a span of the current trace.
+    Args:
+        name (str): The name of the span, e.g. "storage.get_all_users".
+        parent (Optional[Tuple[str, str]]): A trace id and parent span id received from a caller. Without it the
+            span joins the current trace, or starts a new one.
+        **attributes (Any): Extra JSON serializable details stored with the span.
+    Yields:
+        Dict[str, Any]: The span's attributes, which may be updated before the block ends.
+    """
+
+    if not TRACING_ENABLED:
+        yield attributes
+        return
+
+    if parent is not None:
+        trace_id, parent_id = parent
+    else:
+        trace_id, parent_id = _trace_id.get() or new_trace_id(), _span_id.get()
+    # The outermost span of this process, flushed as soon as it ends
+    is_root = parent is not None or parent_id is None
+    span_id = new_span_id()
+
+    trace_token = _trace_id.set(trace_id)
+    span_token = _span_id.set(span_id)
+    start = time.time_ns()
+    try:
+        yield attributes
+    finally:
+        end = time.time_ns()
+        _span_id.reset(span_token)
+        _trace_id.reset(trace_token)
+        record(name, start, end, trace_id, span_id, parent_id, attributes, flush_now=is_root)
+
+
+def record(
+    name: str,
+    start: int,
+    end: int,
+    trace_id: str,
+    span_id: str,
+    parent_id: Optional[str],
+    attributes: Dict[str, Any],
+    flush_now: bool = False,
+) -> None:
+    """
+    Queues a finished span for export.
+    Spans are written to TRACE_FILE by a background thread, so recording a span never does file I/O on the caller's
+    thread or event loop. The thread writes in batches of FLUSH_EVERY, at least every FLUSH_INTERVAL_SECONDS while
+    spans are queued, and as soon as `flush_now` is set (the outermost span of a request or rerun ended). Spans still
+    queued are written at exit.
+    """
+
+    global _flush_requested, _writer
+
+    event = {
+        "name": name,
+        "cat": name.split(".")[0],
+        "ph": "X",
+        "ts": start / 1000,
+        "dur": (end - start) / 1000,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "args": {"trace_id": trace_id, "span_id": span_id, "parent_id": parent_id, **attributes},
+    }
+    with _events_cond:
+        _events.append(event)
+        if flush_now or len(_events) >= FLUSH_EVERY:
+            _flush_requested = True
+            _events_cond.notify()
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name="trace-writer", daemon=True)
+            _writer.start()
+
+
+def _run_writer() -> None:
+    global _flush_requested
+
+    while True:
+        with _events_cond:
+            _events_cond.wait_for(lambda: _flush_requested, timeout=FLUSH_INTERVAL_SECONDS)
+            _flush_requested = False
+        try:
+            flush()
+        except OSError as e:
+            print(f"Error writing trace events {e}")
+
+
+def flush() -> None:
+    """
+    Appends the queued spans to TRACE_FILE, rotating it first if it has reached TRACE_MAX_BYTES.
+    """
+
+    with _events_cond:
+        if not _events:
+            return
+        events = list(_events)
+        _events.clear()
+
+    directory = os.path.dirname(TRACE_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Held by every process appending to the file, so only one of them rotates a full file
+    with file_lock(TRACE_FILE):
+        _append(events)
+
+
+def _append(events: List[Dict[str, Any]]) -> None:
+    if os.path.exists(TRACE_FILE) and os.path.getsize(TRACE_FILE) >= TRACE_MAX_BYTES:
+        os.replace(TRACE_FILE, f"{TRACE_FILE}.1")
+    if not os.path.exists(TRACE_FILE):
+        # Create the file with its opening bracket in one step, so no process can append before it
+        tmp_path = f"{TRACE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"[\n")
+        try:
+            os.link(tmp_path, TRACE_FILE)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+
+    # One write per batch with O_APPEND, so batches from several processes do not interleave
+    fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, "".join(json.dumps(event) + ",\n" for event in events).encode())
+    finally:
+        os.close(fd)
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator that records every call of a function as a span named `name`.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+atexit.register(flush)
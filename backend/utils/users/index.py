@@ -1,87 +1,188 @@
+import asyncio
 import os
 import json
+import zlib
+from functools import partial
 from typing import Dict, List
-import streamlit as st
 
 from backend.classes.index import Course, User
+from backend.utils.catalog.index import CourseIndex
+from backend.utils.changes.index import ChangeLog
+from backend.utils.commit.index import Applied, GroupCommitter
+from backend.utils.files.index import FileIdentity, cache_json, dumps_json_array, file_lock, read_json_cached, write_text_atomic
+from backend.utils.roster.index import RosterIndex
+from backend.utils.shards.index import UserShards
+from backend.utils.stats.index import EnrollmentStats
+from backend.utils.tracing.index import traced
 
+# The most credit hours a student may be enrolled in at once
+MAX_CREDIT_HOURS = int(os.getenv('MAX_CREDIT_HOURS', '18'))
+
+course_index = CourseIndex('backend/db/courses.json', 'backend/db/courses.idx.json')
+# Users are split across shards by a hash of their id, see `backend/reshard_users.py`.
+# Without a manifest there is a single shard, users.json itself.
+user_shards = UserShards('backend/db/users.json', 'backend/db/users.shards.json')
+roster_index = RosterIndex(user_shards.paths)
+enrollment_stats = EnrollmentStats(user_shards.paths, 'backend/db/courses.json')
+change_log = ChangeLog('backend/db/changes.jsonl')
+
+def before_user_flush() -> None:
+    """
+    Brings the indexes derived from the user files up to date before a batch of user writes.
+    """
+    
+    roster_index.ensure_fresh()
+    enrollment_stats.ensure_fresh()
+
+def after_user_flush(path: str, identity: FileIdentity, deltas: List[dict]) -> None:
+    """
+    Applies the changes of a batch written to `path` to the roster index and the enrollment stats, in commit order,
+    and marks them as current. Enrollment changes are also added to the change log.
+    Runs on the committer thread while the file is still locked, so the indexes and the change log see the changes in
+    the order they were written even when the same enrollment is changed concurrently.
+    """
+    
+    for delta in deltas:
+        user = delta['user']
+        if delta['type'] == 'user_created':
+            if user['role'] == 'student':
+                enrollment_stats.add_student(user['id'])
+        elif delta['type'] == 'enrolled':
+            roster_index.add(delta['course']['id'], user)
+            enrollment_stats.enroll(user['id'], delta['course'])
+            change_log.record('enrolled', course_id=delta['course']['id'], user_id=user['id'])
+        elif delta['type'] == 'dropped':
+            roster_index.remove(delta['course']['id'], user['id'])
+            enrollment_stats.drop(user['id'], delta['course']['id'])
+            change_log.record('dropped', course_id=delta['course']['id'], user_id=user['id'])
+    roster_index.mark_synced(path, identity)
+    enrollment_stats.mark_synced(path, identity)
+
+# Concurrent user writes to a shard are applied together and flushed with one write per batch.
+# The roster index and the enrollment stats are brought up to date before a batch, and follow its changes after it.
+users_committers = {
+    path: GroupCommitter(
+        path,
+        max_batch=int(os.getenv('GROUP_COMMIT_MAX_BATCH', '64')),
+        max_delay=float(os.getenv('GROUP_COMMIT_DELAY_MS', '2')) / 1000,
+        before_flush=before_user_flush,
+        after_flush=partial(after_user_flush, path),
+    )
+    for path in user_shards.paths
+}
+
+# Users with the same email can hash to different shards, so registrations reserve the email across all shards
+# by holding one of these locks, picked by a hash of the email, while they check every shard and insert the user
+email_locks = [asyncio.Lock() for _ in range(64)]
+
+def email_lock(email: str) -> asyncio.Lock:
+    """
+    Returns the lock that serializes registrations with this email in this process.
+    """
+    
+    return email_locks[zlib.crc32(email.encode()) % len(email_locks)]
+
+def check_user_files() -> None:
+    """
+    Checks that every user file exists.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
+    """
+    
+    missing = user_shards.missing()
+    if missing is not None:
+        raise FileNotFoundError(f"The {os.path.basename(missing)} file does not exist.")
+
+@traced('storage.get_all_users')
 def get_all_users():
     """
-    Retrieves all user records from the users.json file.
-    Reads the JSON file located at 'backend/db/users.json' and returns its contents as a list of users.
-    If the file does not exist, raises a FileNotFoundError.
-    If the file is empty or contains invalid JSON, returns an empty list.
+    Retrieves all user records from the users.json file, or from every user shard when users are sharded.
+    The parsed files are cached and only read again when their inode, size or modification time changes.
+    If a file does not exist, raises a FileNotFoundError.
+    If a file is empty or contains invalid JSON, it is treated as holding no users.
     Returns:
-        list: A list of user records loaded from the JSON file.
+        list: A list of user records loaded from the JSON files. The list is shared with other callers and must not be modified.
     Raises:
-        FileNotFoundError: If the users.json file does not exist.
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
     """
     
-    path = 'backend/db/users.json'
-    if not os.path.exists(path):
-        raise FileNotFoundError("The users.json file does not exist.")
+    check_user_files()
 
-    with open(path, 'r') as f:
-        try:
-            users: list[User] = json.load(f)
-            return users
-        except json.JSONDecodeError:
-            users = []
+    users: list[User] = user_shards.read_all()
+    return users
 
-def create_user(user: User):
+@traced('storage.get_user_by_email')
+def get_user_by_email(email: str) -> dict | None:
     """
-    Creates a new user entry and appends it to the users.json file.
+    Retrieves a user record by email, through the email index of each user shard.
     Args:
-        user (User): An instance of the User class containing user information to be added.
-    Raises:
-        FileNotFoundError: If the users.json file does not exist.
+        email (str): The email to look up.
     Returns:
-        User: The user object that was added to the file.
+        dict | None: The user record, or None if no user has this email. The record must not be modified.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
     """
     
-    
-    path = 'backend/db/users.json'
+    check_user_files()
 
-    if not os.path.exists(path):
-        raise FileNotFoundError("The users.json file does not exist.")
+    return user_shards.find_by_email(email)
 
-    with open(path, 'r+') as f:
+@traced('storage.get_user_by_id')
+def get_user_by_id(user_id: str) -> dict | None:
+    """
+    Retrieves a user record by id, through the id index of the one shard that can hold it.
+    Args:
+        user_id (str): The id to look up.
+    Returns:
+        dict | None: The user record, or None if no user has this id. The record must not be modified.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
+    """
+    
+    check_user_files()
 
-        try:
-            users: List[Dict[str, str | int]] = json.load(f)
-        
-        except Exception:
-            users = []
-            
-        users.append(user.__dict__)
+    return user_shards.find_by_id(user_id)
 
-        f.seek(0)
-        json.dump(users, f, indent=4)
-        return user
-    
-def logout():
+@traced('storage.create_user')
+async def create_user(user: User):
     """
-    Logs out the current user by removing authentication and user information from the session state.
-    This function checks for the presence of "authenticated" and "user" keys in the Streamlit session state,
-    removes them if they exist, and displays a success message to the user.
+    Creates a new user entry and appends it to the users.json file, or to the user's shard when users are sharded.
+    The write goes through the shard's group committer, so concurrent registrations share a single file write.
+    The email is checked for uniqueness inside the same commit as the insert, so of several concurrent
+    registrations with the same email only the first one is stored. When users are sharded, the other shards are
+    checked while the email is reserved with `email_lock`, which is held until the insert is durable.
+    Students are added to the enrollment stats inside the commit.
     Args:
-        None
+        user (User): An instance of the User class containing user information to be added.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
     Returns:
-        None
+        User | None: The user object that was added to the file, once the write is durable,
+            or None if a user with the same email already exists.
     """
     
-    if "authenticated" in st.session_state:
-        del st.session_state["authenticated"]
-    if "user" in st.session_state:
-        del st.session_state["user"]
-    st.success("You have been logged out successfully.")
+    check_user_files()
 
+    def append_user(users: List[Dict[str, str | int]]) -> Applied:
+        if any(existing['email'] == user.email for existing in users):
+            return Applied(None, changed=False)
+        users.append(user.model_dump())
+        return Applied(user, delta={'type': 'user_created', 'user': users[-1]})
+
+    async with email_lock(user.email):
+        if user_shards.count > 1 and await asyncio.to_thread(user_shards.find_by_email, user.email) is not None:
+            return None
+        return await users_committers[user_shards.path_for(user.id)].submit_async(append_user)
+    
+@traced('storage.create_course_in_db')
 def create_course_in_db(course: Course):
     """
     Adds a new course to the courses.json database file.
     This function takes a Course object, converts it to a dictionary, and appends it to the list of courses
     stored in the 'backend/db/courses.json' file. If the file does not exist, a FileNotFoundError is raised.
     If the file is empty or contains invalid JSON, it initializes an empty list of courses.
+    A "course_created" entry holding the new course is added to the change log, and the course is added to
+    the enrollment stats.
     Args:
         course (Course): The Course object to be added to the database.
     Returns:
@@ -95,27 +196,42 @@ def create_course_in_db(course: Course):
     if not os.path.exists(path):
         raise FileNotFoundError("The courses.json file does not exist.")
 
-    with open(path, 'r+') as f:
+    with file_lock(path):
+        course_index.ensure_fresh()
+        enrollment_stats.ensure_fresh()
 
         try:
-            courses: List[Dict[str, str | int]] = json.load(f)
+            # Copy the cached list, the cached one may be in use by readers
+            courses: List[Dict[str, str | int]] = list(read_json_cached(path))
 
         except Exception:
             courses = []
 
-        courses.append(course.__dict__)
+        new_course = course.model_dump()
+        courses.append(new_course)
 
-        f.seek(0)
-        json.dump(courses, f, indent=4)
-        return course
+        content, spans = dumps_json_array(courses)
+        identity = write_text_atomic(path, content)
+        cache_json(path, identity, courses)
+
+        course_index.record_append(new_course, courses, spans, identity)
+        enrollment_stats.add_course(new_course)
+        enrollment_stats.mark_synced(path, identity)
+        # Recorded before the lock is released, so the log follows the order of the writes
+        change_log.record('course_created', course=new_course)
+
+    return course
     
+@traced('storage.get_all_courses')
 def get_all_courses():
     """
     Retrieves all courses from the courses.json file.
     Reads the list of courses stored in the 'backend/db/courses.json' file. If the file does not exist,
     a FileNotFoundError is raised. If the file exists but contains invalid JSON, an empty list is returned.
+    The parsed file is cached and only read again when its inode, size or modification time changes.
     Returns:
         list[Course]: A list of Course objects loaded from the JSON file, or an empty list if the file is empty or invalid.
+            The list is shared with other callers and must not be modified.
     Raises:
         FileNotFoundError: If the courses.json file does not exist.
     """
@@ -124,92 +240,318 @@ def get_all_courses():
     if not os.path.exists(path):
         raise FileNotFoundError("The courses.json file does not exist.")
 
-    with open(path, 'r') as f:
-        try:
-            courses: list[Course] = json.load(f)
-            return courses
-        except json.JSONDecodeError:
-            courses = []
+    try:
+        courses: list[Course] = read_json_cached(path)
+    except json.JSONDecodeError:
+        courses = []
+    return courses
             
-def replace_exisitng_user(updated_user:User) -> dict[str , str | int]:
+@traced('storage.get_course_by_id')
+def get_course_by_id(course_id: str) -> dict | None:
+    """
+    Retrieves a single course from the courses.json file by its id.
+    The course is located through a persistent id to offset index, so only that record is read and parsed
+    instead of the whole file.
+    Args:
+        course_id (str): The id of the course to fetch.
+    Returns:
+        dict | None: The course record, or None if no course has this id.
+    Raises:
+        FileNotFoundError: If the courses.json file does not exist.
+    """
     
+    path = 'backend/db/courses.json'
+    if not os.path.exists(path):
+        raise FileNotFoundError("The courses.json file does not exist.")
+
+    return course_index.get(course_id)
+
+@traced('storage.get_courses_by_teacher')
+def get_courses_by_teacher(teacher_id: str) -> list[dict]:
     """
-    Replaces an existing user in the users.json file with updated user information.
+    Retrieves the courses created by a teacher.
+    The course ids come from a teacher id to course ids index that is kept up to date by `create_course_in_db`
+    and rebuilt whenever courses.json is loaded, so only the teacher's own records are read from disk.
     Args:
-        updated_user (User): An instance of the User class containing updated user data. The user is identified by its 'id' attribute.
+        teacher_id (str): The id of the teacher.
     Returns:
-        dict[str, str | int]: A dictionary containing the result of the operation:
-            - On success: {'message': 'success', 'status_code': 200, 'data': <updated_user_data>}
-            - On failure: {'message': 'failure', 'status_code': 500}
+        list[dict]: The teacher's courses, or an empty list if the teacher has not created any.
     Raises:
-        FileNotFoundError: If the users.json file does not exist.
-    Notes:
-        - The function reads the users.json file, finds the user with the matching 'id', replaces their data, and writes the updated list back to the file.
-        - If the file cannot be decoded as JSON, an error message is printed and a failure response is returned.
+        FileNotFoundError: If the courses.json file does not exist.
     """
     
-    path = 'backend/db/users.json'
+    path = 'backend/db/courses.json'
     if not os.path.exists(path):
-        raise FileNotFoundError("The users.json file does not exist.")
+        raise FileNotFoundError("The courses.json file does not exist.")
+
+    return course_index.get_by_teacher(teacher_id)
+            
+@traced('storage.update_password_hash')
+async def update_password_hash(user_id: str, hashed_pwd: str) -> dict | None:
+    """
+    Replaces the password hash of a user, e.g. after it was upgraded to a higher bcrypt cost.
+    Only the hash is changed; the rest of the record is taken from the file at write time, so concurrent
+    enrollment changes are not overwritten.
+    Args:
+        user_id (str): The id of the user.
+        hashed_pwd (str): The new bcrypt hash.
+    Returns:
+        dict | None: The updated user record, or None if no user has this id.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
+    """
     
-    with open(path, 'r') as f:
-        try:
-            users: list[User] = json.load(f)
-            for index,user in enumerate(users):
-                if user['id'] == updated_user.id:
-                    users[index] = updated_user.model_dump()
-                    break
-                
-            with open(path, 'w') as f:
-                json.dump(users, f, indent=4)
-                
-            return {'message': 'success', 'status_code': 200, 'data': updated_user.model_dump()}
-        except json.JSONDecodeError as e:
-            print('Erroro replacing user', e)
-            return {'message': 'failure', 'status_code': 500}
-           
-def enroll_user_in_course(user: User, course: Course) -> dict[str, str| int]:
+    check_user_files()
+
+    def replace_hash(users: list[dict]) -> Applied:
+        for index, user in enumerate(users):
+            if user['id'] == user_id:
+                users[index] = {**user, 'hashed_pwd': hashed_pwd}
+                return Applied(users[index])
+        return Applied(None, changed=False)
+
+    return await users_committers[user_shards.path_for(user_id)].submit_async(replace_hash)
+
+@traced('storage.change_enrollment')
+async def change_enrollment(user_id: str, course: Course, enroll: bool) -> dict | None:
+    """
+    Adds a course to, or removes it from, the stored record of a user.
+    The change is applied inside the shard's group commit to the record as it is in the file, matching courses by id,
+    so concurrent enrollment changes of the same user are all kept. The roster index follows the change inside the
+    same commit, and so do the enrollment stats and the change log, see `after_user_flush`.
+    Args:
+        user_id (str): The id of the user.
+        course (Course): The course to add or remove.
+        enroll (bool): True to add the course, False to remove it.
+    Returns:
+        dict | None: The committed user record, or None if no user has this id.
+            Adding a course the user is already enrolled in, or removing one they are not enrolled in, changes nothing.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
+    """
+    
+    check_user_files()
+
+    def apply_change(users: list[dict]) -> Applied:
+        for index, stored in enumerate(users):
+            if stored['id'] != user_id:
+                continue
+
+            enrolled_courses = stored.get('enrolled_courses') or []
+            if enroll:
+                # Enrolling twice, e.g. after a double click, leaves the record as it is
+                if any(c['id'] == course.id for c in enrolled_courses):
+                    return Applied(stored, changed=False)
+                updated_courses = [*enrolled_courses, course.model_dump()]
+            else:
+                updated_courses = [c for c in enrolled_courses if c['id'] != course.id]
+                if len(updated_courses) == len(enrolled_courses):
+                    return Applied(stored, changed=False)
+
+            users[index] = {**stored, 'enrolled_courses': updated_courses}
+            delta = {
+                'type': 'enrolled' if enroll else 'dropped',
+                'user': users[index],
+                'course': updated_courses[-1] if enroll else course.model_dump(),
+            }
+            return Applied(users[index], delta=delta)
+        return Applied(None, changed=False)
+
+    return await users_committers[user_shards.path_for(user_id)].submit_async(apply_change)
+
+@traced('storage.enroll_user_in_course')
+async def enroll_user_in_course(user: User, course: Course) -> dict[str, str| int]:
     """
     Enrolls a user in a given course and updates the user's enrolled courses.
     Args:
-        user (User): The user object to enroll in the course. Must have an 'enrolled_courses' attribute.
+        user (User): The user to enroll in the course. Only its id is used; the stored record is updated.
         course (Course): The course object to enroll the user in.
     Returns:
         dict[str, str | int]: A dictionary containing the result of the enrollment operation.
-            - On success: {'message': 'success', 'status_code': 200, 'data': ...}
+            - On success: {'message': 'success', 'status_code': 200, 'data': <the committed user record>}
             - On failure: {'message': 'failure', 'status_code': 500}
     Notes:
-        - The function appends the course to the user's enrolled_courses list and updates the user record.
-        - Assumes the existence of a 'replace_exisitng_user' function that updates the user in the data store.
+        - The course is appended to the stored record's enrolled_courses inside the group commit, see `change_enrollment`.
+        - The course roster index and the enrollment stats are updated in place inside the commit, from the
+          committed change, without rescanning the user files.
+        - An "enrolled" entry is added to the change log inside the commit, if the user was not enrolled yet.
     """
     
-    if user.enrolled_courses is not None:
-       user.enrolled_courses.append(course)
-      
-       result = replace_exisitng_user(user)
-       if result['status_code'] == 200:
-           return {'message': 'success', 'status_code': 200, 'data': result['data']}
-    
-       
-       return {'message': 'failure', 'status_code': 500}
-    return {'message': 'failure', 'status_code': 500}
+    result = await change_enrollment(user.id, course, enroll=True)
+    if result is None:
+        return {'message': 'failure', 'status_code': 500}
 
-def delete_course_enrollment_from_user(user: User, course: Course)-> dict[str, str| int]:
+    return {'message': 'success', 'status_code': 200, 'data': result}
+
+@traced('storage.delete_course_enrollment_from_user')
+async def delete_course_enrollment_from_user(user: User, course: Course)-> dict[str, str| int]:
     """
     Removes a specified course from a user's list of enrolled courses.
     Args:
-        user (User): The user object from which the course enrollment will be removed.
-        course (Course): The course object to be removed from the user's enrolled courses.
+        user (User): The user to remove the enrollment from. Only its id is used; the stored record is updated.
+        course (Course): The course to be removed from the user's enrolled courses, matched by id.
     Returns:
         dict[str, str | int]: A dictionary containing the result of the operation:
+            - On success: {'message': 'success', 'status_code': 200, 'data': <the committed user record>}
+            - On failure: {'message': 'failure', 'status_code': 500}
+    Notes:
+        - The course is removed from the stored record inside the group commit, see `change_enrollment`.
+        - The course roster index and the enrollment stats are updated in place inside the commit, from the
+          committed change, without rescanning the user files.
+        - A "dropped" entry is added to the change log inside the commit, if the user was enrolled.
     """    
-    if user.enrolled_courses is not None:
-       user.enrolled_courses.remove(course)
-      
-       result = replace_exisitng_user(user)
-       if result['status_code'] == 200:
-           return {'message': 'success', 'status_code': 200,'data': result['data']}
-    
-       
-       return {'message': 'failure', 'status_code': 500}
-    return {'message': 'failure', 'status_code': 500}
\ No newline at end of file
+    result = await change_enrollment(user.id, course, enroll=False)
+    if result is None:
+        return {'message': 'failure', 'status_code': 500}
+
+    return {'message': 'success', 'status_code': 200, 'data': result}
+
+@traced('storage.get_user_enrollments')
+def get_user_enrollments(user_id: str) -> list[dict] | None:
+    """
+    Retrieves the courses a user is enrolled in.
+    The user is looked up in the id index of the one shard that can hold it.
+    Args:
+        user_id (str): The id of the user.
+    Returns:
+        list[dict] | None: The user's enrolled courses, or None if no user has this id.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
+    """
+    
+    check_user_files()
+
+    user = user_shards.find_by_id(user_id)
+    if user is None:
+        return None
+    return user.get('enrolled_courses') or []
+
+@traced('storage.get_student_catalog')
+def get_student_catalog(student_id: str) -> tuple[list[dict], int] | None:
+    """
+    Retrieves every course, flagged for one student.
+    The student's enrolled course ids are collected into a set once, so flagging the catalog is a single pass.
+    Args:
+        student_id (str): The id of the student.
+    Returns:
+        tuple[list[dict], int] | None: The courses, each with an `enrolled` flag and a `can_enroll` flag that is set
+            when the student is not enrolled and the course fits within MAX_CREDIT_HOURS, and the student's total
+            credit hours. None if no user has this id.
+    Raises:
+        FileNotFoundError: If the courses.json file, the users.json file, or one of the user shard files does not exist.
+    """
+    
+    check_user_files()
+
+    student = user_shards.find_by_id(student_id)
+    if student is None:
+        return None
+
+    enrolled_courses = student.get('enrolled_courses') or []
+    enrolled_ids = {course['id'] for course in enrolled_courses}
+    credit_total = sum(course['credit_hours'] for course in enrolled_courses)
+
+    catalog = []
+    for course in get_all_courses():
+        enrolled = course['id'] in enrolled_ids
+        catalog.append({
+            **course,
+            'enrolled': enrolled,
+            'can_enroll': not enrolled and credit_total + course['credit_hours'] <= MAX_CREDIT_HOURS,
+        })
+    return catalog, credit_total
+
+@traced('storage.get_course_students')
+def get_course_students(course_id: str, offset: int, limit: int) -> tuple[list[dict], int]:
+    """
+    Retrieves one page of the students enrolled in a course.
+    Students are read from the course to students reverse index instead of scanning every user record.
+    Args:
+        course_id (str): The id of the course.
+        offset (int): The number of students to skip.
+        limit (int): The maximum number of students to return.
+    Returns:
+        tuple[list[dict], int]: The students on the page (id, name and email) and the total number of enrolled students.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
+    """
+    
+    check_user_files()
+
+    return roster_index.page(course_id, offset, limit)
+
+@traced('storage.get_enrollment_counts')
+def get_enrollment_counts() -> dict[str, int]:
+    """
+    Retrieves the number of students enrolled in every course, from the course roster index.
+    Returns:
+        dict[str, int]: Enrollment counts keyed by course id. Courses without students are omitted.
+    Raises:
+        FileNotFoundError: If the users.json file, or one of the user shard files, does not exist.
+    """
+    
+    check_user_files()
+
+    return roster_index.counts()
+
+@traced('storage.get_enrollment_stats')
+def get_enrollment_stats(verify: bool = False) -> tuple[dict, bool | None]:
+    """
+    Retrieves the enrollment aggregates: students per course, the distribution of credit hours over students,
+    and the courses, enrollments and student credit hours of every teacher.
+    The aggregates are maintained incrementally, so reading them does not scan users or courses.
+    Args:
+        verify (bool): Recompute the aggregates from the data files and check them against the incremental ones.
+    Returns:
+        tuple[dict, bool | None]: The aggregates, and whether the incremental aggregates matched the recomputed
+            ones, or None if `verify` is False.
+    Raises:
+        FileNotFoundError: If the courses.json file, the users.json file, or one of the user shard files does not exist.
+    """
+    
+    check_user_files()
+
+    if verify:
+        return enrollment_stats.verify()
+    return enrollment_stats.snapshot(), None
+
+def get_write_stats() -> dict[str, float]:
+    """
+    Retrieves the counters of the user shards' group committers.
+    Returns:
+        dict[str, float]: The number of shards, and the number of committed mutations, the number of file writes,
+            and the average batch size, summed over all shards.
+    """
+    
+    mutations = flushes = 0
+    for committer in users_committers.values():
+        stats = committer.stats()
+        mutations += stats['mutations']
+        flushes += stats['flushes']
+    return {
+        'shards': user_shards.count,
+        'mutations': mutations,
+        'flushes': flushes,
+        'mutations_per_flush': mutations / flushes if flushes else 0,
+    }
+
+@traced('storage.get_changes_since')
+def get_changes_since(seq: int, limit: int) -> tuple[list[dict], int, bool]:
+    """
+    Retrieves the catalog and enrollment changes made after a sequence number.
+    Args:
+        seq (int): The last sequence number the client has seen, 0 for the whole history.
+        limit (int): The maximum number of changes to return.
+    Returns:
+        tuple[list[dict], int, bool]: The changes oldest first, the latest sequence number,
+            and whether more changes are available after the returned ones.
+    """
+    
+    return change_log.since(seq, limit)
+
+def get_change_version() -> int:
+    """
+    Retrieves the latest sequence number in the change log, 0 if nothing has changed yet.
+    """
+    
+    return change_log.latest()
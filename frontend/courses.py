@@ -3,11 +3,14 @@ import streamlit as st
 import requests as req
 from dotenv import load_dotenv
 import os
+from backend.utils.tracing.index import trace_headers
+from frontend.utils.index import post_idempotent
 
 def courses() -> None:
     """
     Displays a list of all available courses and allows the user to view course details and enroll in a course.
-    This function fetches the list of courses from the backend API and presents them as buttons in the Streamlit interface.
+    This function fetches the catalog annotated for the current student from the backend API and presents it as buttons
+    in the Streamlit interface. Whether a course can be enrolled in is decided by the backend.
     When a course is selected, a modal dialog shows detailed information about the course and provides an option to enroll.
     Handles user enrollment by sending a POST request to the backend API and updates the session state accordingly.
     Accepts:
@@ -24,25 +27,56 @@ def courses() -> None:
     st.title("All Courses")
     
     user = st.session_state.get('user')
+    # The button list only needs these fields, the full course is fetched when one is selected
+    catalog_fields = ['id', 'title', 'credit_hours', 'enrolled', 'can_enroll']
 
-    credit_hours = 0
-    total_credit_hours = sum([c.get('credit_hours') + credit_hours for c in user.get("enrolled_courses")])    
-    
-    st.subheader(f'Total credit hours of courses you have enrolled: ({total_credit_hours})')
-    
-    st.subheader(f'Max credit hours: (18)')
+    def load_catalog() -> dict:
+        # The last catalog is kept per student; while nothing has changed the backend answers 304 without a body
+        cached = st.session_state.get('student_catalog')
+        if cached and cached['student_id'] != user['id']:
+            cached = None
+
+        headers = trace_headers()
+        if cached:
+            headers['If-None-Match'] = cached['etag']
+        response = req.get(
+            f"{API_URL}/api/students/{user['id']}/catalog",
+            params={"fields": ",".join(catalog_fields)},
+            headers=headers,
+        )
+        if response.status_code == 304:
+            return cached['data']
+
+        response.raise_for_status()
+        data = response.json()["data"]
+        st.session_state.student_catalog = {'student_id': user['id'], 'etag': response.headers.get('ETag'), 'data': data}
+        return data
+
+    courses = []
+    total_credit_hours = 0
+    max_credit_hours = 18
     try:
-        response = req.get(f"{API_URL}/api/courses")
-        result = response.json()
-        courses = result["data"]["courses"]
+        catalog = load_catalog()
+        courses = catalog['courses']
+        total_credit_hours = catalog['credit_total']
+        max_credit_hours = catalog['max_credit_hours']
     except Exception as e:
         st.error(f"Failed to load all courses {e}")
+
+    st.subheader(f'Total credit hours of courses you have enrolled: ({total_credit_hours})')
+    
+    st.subheader(f'Max credit hours: ({max_credit_hours})')
         
     if 'selected_course' not in st.session_state:
         st.session_state.selected_course = None
-        
 
-        
+
+    def fetch_course_details(course_id: str):
+        response = req.get(f"{API_URL}/api/courses/{course_id}", headers=trace_headers())
+        if response.status_code == 200:
+            return response.json()["data"]["course"]
+        return None
+
     @st.dialog('Course Details', width='large')  
     def show_modal():
         course = st.session_state.selected_course
@@ -50,11 +84,12 @@ def courses() -> None:
         def handle_register():
             user = st.session_state.user
             course = st.session_state.selected_course
-            response = req.post(f'{API_URL}/api/courses/enroll',
-                                json={
-                                    'user': user,
-                                    'course': course
-                                    })
+            response = post_idempotent(f'{API_URL}/api/courses/enroll',
+                                       {
+                                           'user': user,
+                                           'course': course
+                                       },
+                                       action=f"enroll:{user['id']}:{course['id']}")
             if response.status_code == 200:
                 st.success('Course enrolment successfull. Go to your dashboard for more info')
                 st.session_state.user = response.json()['data']
@@ -69,21 +104,19 @@ def courses() -> None:
             st.text(f'Credit hours: {course['credit_hours']}')
             st.text(f'Description: {course['description']}')
             
-            is_already_enrolled = course in st.session_state.user['enrolled_courses']
-            
-            st.button('Enroll in this course', type='primary', use_container_width=True, on_click=handle_register, disabled=is_already_enrolled)
+            st.button('Enroll in this course', type='primary', use_container_width=True, on_click=handle_register, disabled=not st.session_state.selected_can_enroll)
     
     def select_and_show(course):
-        st.session_state.selected_course = course
+        st.session_state.selected_course = fetch_course_details(course['id'])
+        st.session_state.selected_can_enroll = course['can_enroll']
         show_modal()
         
         
     for course in courses:
-        is_already_enrolled = course in st.session_state.user['enrolled_courses']
         st.button(
             f"{course['title']} ➕",
             on_click=partial(select_and_show, course),
-            disabled=is_already_enrolled or total_credit_hours > 18
+            disabled=not course['can_enroll']
             )
         
 
@@ -1,7 +1,7 @@
 import streamlit as st
-import requests as req
 import os
 from dotenv import load_dotenv
+from frontend.utils.index import post_idempotent
 
 def create_course():
     """
@@ -26,9 +26,9 @@ def create_course():
         user = st.session_state.get("user")
         
         if user:
-            response = req.post(
+            response = post_idempotent(
                 f"{API_URL}/api/courses/create",
-                json={
+                {
                     "title": course_name,
                     "credit_hours": credit_hours,
                     "description": description,
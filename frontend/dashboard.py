@@ -1,9 +1,18 @@
 import streamlit as st
-import pandas as pd
 import requests as req
 import os
 from dotenv import load_dotenv
 from backend.classes.index import Course, User
+from frontend.utils.index import fetch_table
+from backend.utils.tracing.index import trace_headers
+
+COURSE_COLUMNS = {
+    "id": "Course ID",
+    "title": "Course Title",
+    "credit_hours": "Credit Hours",
+    "teacher_name": "Teacher",
+    "enrollment_count": "Enrolled Students",
+}
 
 
 def dashboard():
@@ -32,30 +41,40 @@ def dashboard():
         st.title("Teacher Dashboard")
         # have to shopw all courses created by teacher
 
-        response = req.get(f"{API_URL}/api/courses")
-        result = response.json()
-
-        courses = result["data"]["courses"]
-
-        teacher_courses = []
-        for course in courses:
-            if course["teacher"]["id"] == user["id"]:
-                teacher_courses.append(course)
-
-        data = [
-            {
-                "Course ID": c.get("id"),
-                "Course Title": c.get("title"),
-                "Credit Hours": c.get("credit_hours"),
-                "Teacher": c.get("teacher").get("name"),
-            }
-            for c in teacher_courses
-        ]
+        teacher_courses, _ = fetch_table(
+            f"{API_URL}/api/teachers/{user['id']}/courses",
+            "courses",
+            params={"fields": "id,title,credit_hours,teacher,enrollment_count"},
+        )
 
-        df = pd.DataFrame(data)
+        df = teacher_courses.reindex(
+            columns=["id", "title", "credit_hours", "teacher_name", "enrollment_count"]
+        ).rename(columns=COURSE_COLUMNS)
         st.subheader("Created Courses")
         st.dataframe(df, hide_index=True)
 
+        if not df.empty:
+            st.subheader("Enrolled Students")
+            titles = dict(zip(df["Course ID"], df["Course Title"]))
+            selected = st.selectbox(
+                "Course",
+                options=list(titles),
+                format_func=lambda course_id: titles[course_id],
+            )
+            page_size = 50
+            page = st.number_input("Page", min_value=1, value=1, step=1)
+
+            try:
+                students, roster = fetch_table(
+                    f"{API_URL}/api/courses/{selected}/students",
+                    "students",
+                    params={"offset": (page - 1) * page_size, "limit": page_size},
+                )
+                st.caption(f"{roster['total']} students enrolled")
+                st.dataframe(students, hide_index=True)
+            except req.HTTPError:
+                st.error("Failed to load enrolled students.")
+
     if role == "student":
         st.header(f"Welcome, {user['name']}")
         st.title("Student Dashboard")
@@ -64,6 +83,7 @@ def dashboard():
             response = req.delete(
                 f"{API_URL}/api/courses",
                 json={"course": course, "user": user},
+                headers=trace_headers(),
             )
 
             if response.status_code == 200:
@@ -73,21 +93,13 @@ def dashboard():
                 st.error("Failed to drop course. please try again")
 
         if user.get("enrolled_courses"):
-            data = [
-                {
-                    "Course ID": c.get("id"),
-                    "Course Title": c.get("title"),
-                    "Credit Hours": c.get("credit_hours"),
-                    "Teacher": c.get("teacher").get("name"),
-                }
-                for c in user.get("enrolled_courses")
-            ]
-            
-            credit_hours = 0
-            total_credit_hours = sum([c.get('credit_hours') + credit_hours for c in user.get("enrolled_courses")])
+            enrolled, _ = fetch_table(f"{API_URL}/api/users/{user['id']}/enrollments", "courses")
+            df = enrolled.reindex(
+                columns=["id", "title", "credit_hours", "teacher_name"]
+            ).rename(columns=COURSE_COLUMNS)
             
+            total_credit_hours = int(df["Credit Hours"].sum())
             
-            df = pd.DataFrame(data)
             st.subheader(f"Enrolled Courses - Credit hours ({total_credit_hours})")
             st.dataframe(df, hide_index=True)
 
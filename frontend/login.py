@@ -2,6 +2,8 @@ import os
 import streamlit as st
 import requests as req
 from dotenv import load_dotenv
+from backend.utils.tracing.index import trace_headers
+from frontend.utils.index import client_headers
 
 def login():
     """
@@ -22,7 +24,8 @@ def login():
     def handle_login(email:str, password:str) -> None:
         response = req.post(
             f"{API_URL}/api/login",
-            json={"email": email, "password": password}
+            json={"email": email, "password": password},
+            headers={**trace_headers(), **client_headers()},
         )
         
         result = response.json()
@@ -32,6 +35,8 @@ def login():
             st.session_state.authenticated = True
             
             st.session_state.user = result.get('data').get('user')
+        elif response.status_code == 429:
+            st.error(result.get('message'))
         else:
             st.error("Login failed. Please check your credentials.")
 
@@ -1,5 +1,6 @@
 import streamlit as st
-from backend.utils.users.index import logout
+from frontend.utils.index import logout
+from backend.utils.tracing.index import span
 
 
 def main():
@@ -42,7 +43,9 @@ def main():
 
     pg = st.navigation(pages)
 
-    pg.run()
+    # Each rerun is a trace; the backend calls made while rendering the page are nested under it
+    with span("streamlit.rerun", page=pg.title):
+        pg.run()
 
     if is_logged_in:
         st.button(
@@ -1,7 +1,7 @@
 from dotenv import load_dotenv
 import streamlit as st
-import requests as req
 import os
+from frontend.utils.index import post_idempotent
 
 def register():
     """
@@ -19,9 +19,9 @@ def register():
     API_URL = os.getenv('API_URL')
     def handle_register(name:str ,email:str, password:str, role: str) -> None:
         
-        response = req.post(
+        response = post_idempotent(
             f"{API_URL}/api/register",
-            json={"name": name, "email": email, "password": password, "role": role.lower()}
+            {"name": name, "email": email, "password": password, "role": role.lower()},
         )
         
         if response.status_code == 201:
@@ -0,0 +1,111 @@
+import json
+import time
+import uuid
+import pandas as pd
+import pyarrow as pa
+import requests as req
+import streamlit as st
+from backend.utils.tracing.index import trace_headers
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+RETRY_STATUSES = {502, 503, 504}
+
+
+def logout():
+    """
+    Logs out the current user by removing authentication and user information from the session state.
+    This function checks for the presence of "authenticated" and "user" keys in the Streamlit session state,
+    removes them if they exist, and displays a success message to the user.
+    Args:
+        None
+    Returns:
+        None
+    """
+    
+    if "authenticated" in st.session_state:
+        del st.session_state["authenticated"]
+    if "user" in st.session_state:
+        del st.session_state["user"]
+    st.success("You have been logged out successfully.")
+
+
+def client_headers() -> dict[str, str]:
+    """
+    Returns the `X-Forwarded-For` header carrying the address of the browser this session serves.
+    The backend rate limits logins per end user with it, since every API call comes from the Streamlit server.
+    Returns:
+        dict[str, str]: The header, or no header if the address is unknown (e.g. when browsing on localhost).
+    """
+    
+    ip_address = getattr(st.context, "ip_address", None)
+    return {"X-Forwarded-For": ip_address} if ip_address else {}
+
+
+def fetch_table(url: str, key: str, params: dict | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    Fetches a list endpoint as a DataFrame.
+    The backend is asked for an Arrow IPC stream, so the DataFrame is built straight from columns without creating
+    a Python dict per row. If the backend answers with JSON instead, the list stored under `key` is used.
+    Args:
+        url (str): The URL of the list endpoint.
+        key (str): The key holding the list in a JSON response's data, e.g. "courses".
+        params (dict | None): Query parameters for the request.
+    Returns:
+        tuple[pd.DataFrame, dict]: The table, and the extra values sent along with it (such as a total count).
+    Raises:
+        requests.HTTPError: If the backend responds with an error status.
+    """
+    
+    response = req.get(url, params=params, headers={"Accept": f"{ARROW_STREAM}, application/json;q=0.9", **trace_headers()})
+    response.raise_for_status()
+
+    if response.headers.get("content-type", "").startswith(ARROW_STREAM):
+        reader = pa.ipc.open_stream(response.content)
+        table = reader.read_all()
+        metadata = {k.decode(): json.loads(v) for k, v in (table.schema.metadata or {}).items()}
+        return table.to_pandas(), metadata
+
+    data = response.json()["data"]
+    metadata = {k: v for k, v in data.items() if k != key}
+    return pd.json_normalize(data[key], sep="_"), metadata
+
+
+def post_idempotent(url: str, payload: dict, action: str | None = None, attempts: int = 3, backoff: float = 0.25) -> req.Response:
+    """
+    Sends a POST request that creates something, retrying it if the outcome is unknown.
+    Every attempt carries the same `Idempotency-Key`, so the backend executes the request at most once and answers
+    retries with the first response, even if the connection dropped after the request was processed.
+    When an `action` is given, its key is kept in the session state until the backend gives a final answer, so a
+    rerun that interrupts the request, such as a double click, sends the same action with the same key again.
+    Args:
+        url (str): The URL of the endpoint.
+        payload (dict): The JSON body of the request.
+        action (str | None): Identifies the user action, e.g. "enroll:<user id>:<course id>". Defaults to None,
+            which uses a new key for every call.
+        attempts (int): The maximum number of attempts. Defaults to 3.
+        backoff (float): The delay before the first retry in seconds, doubled on every retry. Defaults to 0.25.
+    Returns:
+        requests.Response: The response of the last attempt.
+    Raises:
+        requests.ConnectionError: If the backend cannot be reached on any attempt.
+    """
+    
+    if action is None:
+        key = str(uuid.uuid4())
+    else:
+        key = st.session_state.setdefault(f"idempotency_key:{action}", str(uuid.uuid4()))
+
+    headers = {"Idempotency-Key": key}
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        try:
+            response = req.post(url, json=payload, headers={**headers, **trace_headers()})
+        except (req.ConnectionError, req.Timeout):
+            if last_attempt:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                if action is not None and response.status_code not in RETRY_STATUSES:
+                    del st.session_state[f"idempotency_key:{action}"]
+                return response
+        time.sleep(backoff * 2 ** attempt)
@@ -1,4 +1,7 @@
+import socket
 import subprocess
+import tempfile
+import threading
 import time
 import sys
 from pathlib import Path
@@ -8,33 +11,71 @@ import os
 
 
 class ProcessManager:
-    def __init__(self, name, start_command, watch_dir):
+    """
+    Runs a server process and restarts it when Python files in `watch_dir` change.
+    Bursts of file events are coalesced over `debounce` seconds into a single reload.
+    When `listen` is given, the manager owns the listening socket and hands it to every process with uvicorn's
+    `--fd` option. A reload then starts the new process on the same socket, waits until it reports that it is ready,
+    and only then stops the old one, so no request is refused while reloading.
+    """
+
+    def __init__(self, name, start_command, watch_dir, listen=None, debounce=0.5, ready_timeout=30):
         self.name = name
         self.start_command = start_command
         self.watch_dir = Path(watch_dir).resolve()
+        self.listen = listen
+        self.debounce = debounce
+        self.ready_timeout = ready_timeout
         self.process = None
         self.observer = None
+        self.sock = None
+        self._timer = None
+        self._timer_lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+
+    @property
+    def zero_downtime(self):
+        # Passing a listening socket to a child process needs POSIX file descriptor inheritance
+        return self.listen is not None and os.name == "posix"
 
     def start(self):
+        if self.zero_downtime:
+            with self._restart_lock:
+                self._handoff()
+            return
+
+        command = self.start_command
+        if self.listen is not None:
+            host, port = self.listen
+            command = [*command, "--host", host, "--port", str(port)]
+
         self.stop()  # kill any existing
         print(f"🚀 Starting {self.name}...")
-        self.process = subprocess.Popen(self.start_command)
+        self.process = subprocess.Popen(command)
         print(f"✅ {self.name} started.")
 
     def stop(self):
         if self.process and self.process.poll() is None:
             print(f"🛑 Stopping {self.name}...")
-            self.process.terminate()
-            try:
-                self.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self.process.kill()
+            self._terminate(self.process)
             print(f"✅ {self.name} stopped.")
 
     def restart(self):
         print(f"🔄 Reloading {self.name} due to changes...")
         self.start()
 
+    def schedule_restart(self):
+        """
+        Restarts the process once no new file events have arrived for `debounce` seconds.
+        """
+
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.restart)
+            self._timer.daemon = True
+            self._timer.start()
+
     def watch(self):
         class ReloadHandler(FileSystemEventHandler):
             def __init__(self, manager):
@@ -42,7 +83,7 @@ class ProcessManager:
 
             def on_any_event(self, event):
                 if event.src_path.endswith(".py"):
-                    self.manager.restart()
+                    self.manager.schedule_restart()
 
         print(f"👀 Watching {self.name} at {self.watch_dir}")
         event_handler = ReloadHandler(self)
@@ -51,10 +92,67 @@ class ProcessManager:
         self.observer.start()
 
     def shutdown(self):
-        self.stop()
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
         if self.observer:
             self.observer.stop()
             self.observer.join()
+        self.stop()
+        if self.sock:
+            self.sock.close()
+
+    def _handoff(self):
+        if self.sock is None:
+            host, port = self.listen
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind((host, port))
+            self.sock.listen(2048)
+            self.sock.set_inheritable(True)
+
+        ready_file = Path(tempfile.gettempdir()) / f"{self.name.replace(' ', '_')}-{time.time_ns()}.ready"
+        env = os.environ.copy()
+        env["BACKEND_READY_FILE"] = str(ready_file)
+
+        print(f"🚀 Starting {self.name}...")
+        new_process = subprocess.Popen(
+            [*self.start_command, "--fd", str(self.sock.fileno())],
+            pass_fds=(self.sock.fileno(),),
+            env=env,
+        )
+
+        if not self._wait_until_ready(new_process, ready_file):
+            print(f"❌ {self.name} failed to become ready, keeping the running version.")
+            self._terminate(new_process)
+            return
+
+        old_process, self.process = self.process, new_process
+        print(f"✅ {self.name} started.")
+        if old_process and old_process.poll() is None:
+            print(f"🛑 Stopping previous {self.name}...")
+            # The socket stays open in this process, so connections queue for the new process meanwhile
+            self._terminate(old_process)
+
+    def _wait_until_ready(self, process, ready_file):
+        deadline = time.monotonic() + self.ready_timeout
+        try:
+            while time.monotonic() < deadline:
+                if ready_file.exists():
+                    return True
+                if process.poll() is not None:
+                    return False
+                time.sleep(0.05)
+            return False
+        finally:
+            ready_file.unlink(missing_ok=True)
+
+    def _terminate(self, process):
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
 
 
 def main():
@@ -65,12 +163,10 @@ def main():
             "-m",
             "uvicorn",
             "backend.main:app",
-            "--host",
-            "0.0.0.0",
-            "--port",
-            "8000"
         ],
-        "backend"
+        "backend",
+        listen=("0.0.0.0", 8000),
+        debounce=float(os.getenv("RELOAD_DEBOUNCE_SECONDS", "0.5")),
     )
 
     # Streamlit doesn't need external reloading